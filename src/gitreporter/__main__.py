@@ -96,6 +96,12 @@ def parse_arguments() -> dict:
         help="minimum size of a block to be considered for recursive diff",
         dest="diff-recursion-block-size-threshold"
     )
+    parser.add_argument(
+        "--diff-algorithm",
+        choices=["difflib", "histogram"],
+        help="line diff algorithm, histogram is faster for large files with many repeated lines",
+        dest="diff-algorithm"
+    )
     parser.add_argument(
         "--allow-modifications",
         action="store_true",
@@ -120,6 +126,61 @@ def parse_arguments() -> dict:
         help="check for comments and coding standard (currently only supported for c-like languages)",
         dest="comments-and-coding-standard"
     )
+    parser.add_argument(
+        "--detect-moved-code",
+        action="store_true",
+        help="detect code moved between files, moved lines keep their history",
+        dest="detect-moved-code"
+    )
+
+    # performance settings
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="number of worker processes, the files of the repository are distributed among them for the analysis "
+             "and the rendering of the report",
+        dest="workers"
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="store the analysis in a cache and only analyze new commits in the next run",
+        dest="cache"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="directory of the analysis cache, default is inside the .git directory of the repository",
+        dest="cache-dir"
+    )
+    parser.add_argument(
+        "--memory-bounded",
+        action="store_true",
+        help="release the files of a commit as soon as all of its children are processed",
+        dest="memory-bounded"
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=int,
+        help="memory budget in MB, files still needed by pending commits are spilled to disk above it",
+        dest="memory-budget"
+    )
+    parser.add_argument(
+        "--line-cache-size",
+        type=int,
+        help="maximum number of cached lines of parsed files, files with the same content are parsed only once",
+        dest="line-cache-size"
+    )
+    parser.add_argument(
+        "--line-cache-dir",
+        help="directory in which parsed files are stored, such that later runs can reuse them",
+        dest="line-cache-dir"
+    )
+    parser.add_argument(
+        "--diff-cache-dir",
+        help="directory in which the diffs of modified files are stored by the blob ids, such that later runs and "
+             "other repositories can reuse them",
+        dest="diff-cache-dir"
+    )
 
     # report settings
     parser.add_argument(
@@ -128,6 +189,25 @@ def parse_arguments() -> dict:
         help="output the report in json format",
         dest="json"
     )
+    parser.add_argument(
+        "--ndjson",
+        action="store_true",
+        help="export the statistics per commit and file, per author and file and the origin of every line as "
+             "newline delimited json (gitreport.ndjson) instead of the html report",
+        dest="ndjson"
+    )
+    parser.add_argument(
+        "--ndjson-gzip",
+        action="store_true",
+        help="compress the newline delimited json export (gitreport.ndjson.gz)",
+        dest="ndjson-gzip"
+    )
+    parser.add_argument(
+        "--lazy-line-mapping",
+        action="store_true",
+        help="store the line mappings of the file reports in compressed chunks, which are loaded while scrolling",
+        dest="lazy-line-mapping"
+    )
 
     return vars(parser.parse_args(sys.argv[1:] if len(sys.argv) > 1 else ["-h"]))
 
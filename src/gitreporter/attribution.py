@@ -0,0 +1,30 @@
+from array import array
+from collections import Counter
+
+from .statistic_values import LINE_CATEGORIES, LINE_INDEX
+from .textline import Textline
+
+
+class GitLineAttribution:
+    """
+    Attribution of the lines of a file of the tip commit: the commit id of the origin of every line (the first commit
+    of its history) and the index of its line category (see LINE_INDEX). It is computed once per file and depends on
+    the lines of this file only, the survived lines and the line mapping of the report are derived from it.
+    """
+    __slots__ = ('commits', 'categories')
+
+    # ids of the line categories in the html report
+    CATEGORY_IDS = [category.value.lower().replace(" ", "_") for category in LINE_CATEGORIES]
+
+    def __init__(self, lines: list[Textline]):
+        self.commits = array('q', [line.history.first for line in lines])
+        self.categories = array('b', [LINE_INDEX[line.get_type()] for line in lines])
+
+    def __len__(self):
+        return len(self.commits)
+
+    def counts(self):
+        """
+        returns the number of lines per (commit id, category index), in the order of the first line
+        """
+        return Counter(zip(self.commits, self.categories))
@@ -0,0 +1,66 @@
+import subprocess
+
+from git import Repo
+from git.compat import safe_decode
+
+
+class GitBlobReaderException(Exception):
+    pass
+
+
+class GitBlobReader:
+    """
+    Reads blobs by their object id from a single long-lived `git cat-file --batch` process.
+    Requests are written in chunks before the responses are read, such that the pipe buffers are never exceeded.
+    """
+    CHUNK_SIZE = 256
+
+    def __init__(self, repo: Repo):
+        self.repo = repo
+        self.process = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def start(self):
+        self.process = self.repo.git.cat_file('--batch', as_process=True, istream=subprocess.PIPE)
+
+    def close(self):
+        if self.process is None:
+            return
+        self.process.stdin.close()
+        self.process.wait()
+        self.process = None
+
+    def read_blobs(self, hexshas: list[str]) -> list[str]:
+        """
+        returns the decoded content of the blobs, the trailing newline is removed (same output as `git show`)
+        """
+        if self.process is None:
+            self.start()
+
+        contents = []
+        for idx in range(0, len(hexshas), self.CHUNK_SIZE):
+            chunk = hexshas[idx:idx + self.CHUNK_SIZE]
+            self.process.stdin.write(''.join(f'{hexsha}\n' for hexsha in chunk).encode('ascii'))
+            self.process.stdin.flush()
+            contents += [self.read_response(hexsha) for hexsha in chunk]
+        return contents
+
+    def read_blob(self, hexsha: str) -> str:
+        return self.read_blobs([hexsha])[0]
+
+    def read_response(self, hexsha: str) -> str:
+        header = self.process.stdout.readline().split()
+        if len(header) != 3:
+            raise GitBlobReaderException(f"error: could not read object {hexsha} from git.")
+        size = int(header[2])
+        data = self.process.stdout.read(size)
+        self.process.stdout.read(1)
+
+        if data.endswith(b'\n'):
+            data = data[:-1]
+        return safe_decode(data)
@@ -0,0 +1,122 @@
+import re
+
+from .types import GitLineCategory as LineCategory
+
+
+class GitCTokenizer:
+    """
+    Scanner for comments of c-like languages, it is equivalent to the former Pygments lexer (root, multiline comment,
+    char and string state): every newline is a line break (a backslash newline inside a string as well), comments
+    belong to COMMENT and everything else to CODE. Whitespace is removed.
+    tokenize returns for every line the list of [category, content], consecutive parts of a category are joined and
+    empty parts are skipped. An empty list is an empty line.
+    """
+    # newlines in code and multiline comments are handled in add_text
+    ROOT = re.compile(r'//|/\*|[\'"]')
+    COMMENT_MULTILINE = re.compile(r'\*/')
+    CHAR = re.compile(r"[\\'\n]")
+    STRING = re.compile(r'[\\"\n]')
+
+    def __init__(self, text: str):
+        self.text = text
+        self.lines: list[list] = []
+        self.line: list[list] = []
+        self.category = LineCategory.CODE
+        self.run: list[str] = []
+
+    def add(self, category: LineCategory, content: str):
+        if category is not self.category:
+            self.flush()
+            self.category = category
+        self.run.append(content)
+
+    def flush(self):
+        content = "".join("".join(self.run).split())
+        self.run = []
+        if not content:
+            return
+        if self.line and self.line[-1][0] is self.category:
+            self.line[-1][1] += content
+        else:
+            self.line.append([self.category, content])
+
+    def add_text(self, category: LineCategory, text: str):
+        """
+        adds text, which might contain newlines, lines in between only consist of one part
+        """
+        pieces = text.split('\n')
+        self.add(category, pieces[0])
+        if len(pieces) == 1:
+            return
+
+        self.newline()
+        for piece in pieces[1:-1]:
+            content = "".join(piece.split())
+            self.lines.append([[category, content]] if content else [])
+        self.add(category, pieces[-1])
+
+    def newline(self):
+        self.flush()
+        self.lines.append(self.line)
+        self.line = []
+
+    def error(self):
+        # a backslash at the end of the text or in front of a newline in a char literal is not a valid token
+        self.flush()
+        if not self.line:
+            assert False, 'This code should be unreachable! We have type: Token.Error'
+        assert False, f'This code should be unreachable! We have type: Token.Error, {self.text}'
+
+    def tokenize(self):
+        text = self.text
+        length = len(text)
+        pos = 0
+        state = self.ROOT
+        while pos < length:
+            match = state.search(text, pos)
+            if match is None:
+                self.add_text(LineCategory.COMMENT if state is self.COMMENT_MULTILINE else LineCategory.CODE,
+                              text[pos:])
+                break
+
+            start = match.start()
+            token = match.group()
+            if start > pos:
+                self.add_text(LineCategory.COMMENT if state is self.COMMENT_MULTILINE else LineCategory.CODE,
+                              text[pos:start])
+            pos = match.end()
+
+            if token == '\n':
+                self.newline()
+            elif state is self.ROOT:
+                if token == '//':
+                    end = text.find('\n', pos)
+                    end = length if end < 0 else end
+                    self.add(LineCategory.COMMENT, text[start:end])
+                    pos = end
+                elif token == '/*':
+                    self.add(LineCategory.COMMENT, token)
+                    state = self.COMMENT_MULTILINE
+                else:
+                    self.add(LineCategory.CODE, token)
+                    state = self.CHAR if token == "'" else self.STRING
+            elif state is self.COMMENT_MULTILINE:
+                self.add(LineCategory.COMMENT, token)
+                state = self.ROOT
+            elif token == '\\':
+                if pos < length and text[pos] != '\n':
+                    self.add(LineCategory.CODE, text[start:pos + 1])
+                    pos += 1
+                elif pos < length and state is self.STRING:
+                    self.newline()
+                    pos += 1
+                else:
+                    self.error()
+            else:
+                self.add(LineCategory.CODE, token)
+                state = self.ROOT
+
+        self.flush()
+        if self.line:
+            self.lines.append(self.line)
+        return self.lines
@@ -0,0 +1,94 @@
+import os
+import pickle
+import hashlib
+
+from git import Repo
+
+from .commit import GitCommit, GitCommitStatus
+from .commit_statistic import GitCommitStatistic
+from .config import Config
+from .scheduler import GitCommitScheduler
+
+
+class GitAnalysisCache:
+    """
+    Stores the state of an analysis (files of the start commit and the statistics of all analyzed commits) on disk,
+    such that the next run only has to process commits, which are not contained in the cache.
+    """
+    VERSION = 7
+
+    def __init__(self, config: Config, repo: Repo):
+        self.config = config
+        cache_dir = config.options["cache-dir"] or os.path.join(repo.git_dir, 'gitreporter')
+        key = hashlib.sha256(f'{os.path.abspath(repo.working_dir)}\0{config.options["branch"]}\0'
+                             f'{config.analysis_fingerprint()}'.encode('utf-8'))
+        self.path = os.path.join(cache_dir, f'{key.hexdigest()[:32]}.cache')
+
+    def load(self):
+        """
+        returns the cached state, or None if there is no valid cache for the current version and options
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                state = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, TypeError):
+            return None
+
+        if type(state) != dict or state.get('version') != self.VERSION \
+                or state.get('fingerprint') != self.config.analysis_fingerprint():
+            return None
+        return state
+
+    def restore(self, commit_list: list[GitCommit], start_commit: GitCommit):
+        """
+        Marks all cached ancestors of the start commit as visited and restores their statistics and the files of the
+        cached start commit and returns the cached start commit.
+        This is only possible if all new commits are descendants of the cached start commit, otherwise nothing is
+        changed and None is returned.
+        """
+        state = self.load()
+        if state is None:
+            return None
+
+        commits = {commit.commit.binsha: commit for commit in commit_list}
+        cached_start_commit = commits.get(state['start-commit'])
+        if cached_start_commit is None:
+            return None
+
+        ancestors = GitCommitScheduler(start_commit).commits
+        if id(cached_start_commit) not in {id(commit) for commit in ancestors}:
+            return None
+
+        for commit in ancestors:
+            if commit.commit.binsha in state['statistics']:
+                commit.status = GitCommitStatus.VISITED
+
+        for commit in GitCommitScheduler(start_commit).commits:
+            for parent in commit.parents:
+                if parent.status == GitCommitStatus.VISITED and parent is not cached_start_commit:
+                    # the files of this parent are not stored in the cache
+                    for ancestor in ancestors:
+                        ancestor.status = GitCommitStatus.UNVISITED
+                    return None
+
+        for commit in ancestors:
+            if commit.status == GitCommitStatus.VISITED:
+                commit.statistics = GitCommitStatistic()
+                commit.statistics.file_mapping = state['statistics'][commit.commit.binsha]
+        cached_start_commit.files = state['files']
+        return cached_start_commit
+
+    def store(self, commit_list: list[GitCommit], start_commit: GitCommit):
+        state = {
+            'version': self.VERSION,
+            'fingerprint': self.config.analysis_fingerprint(),
+            'start-commit': start_commit.commit.binsha,
+            'statistics': {commit.commit.binsha: commit.statistics.file_mapping
+                           for commit in commit_list if commit.status == GitCommitStatus.VISITED},
+            'files': start_commit.files
+        }
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(f'{self.path}.tmp', 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f'{self.path}.tmp', self.path)
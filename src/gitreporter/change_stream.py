@@ -0,0 +1,88 @@
+from typing import NamedTuple, Union
+
+from git import Repo
+from git.compat import safe_decode
+from git.util import bin_to_hex, hex_to_bin
+
+from .commit_graph import GitCommitGraph
+
+
+class GitFileChange(NamedTuple):
+    status: str
+    path: str
+    old_blob: str
+    new_blob: str
+
+
+class GitChangeStream:
+    """
+    Reads the changes of all commits of a branch with a single `git log --raw -m` call.
+    Iterating yields (commit binsha, parent binsha, changes) for every commit and every parent of a merge commit.
+    The parent binsha is None for root commits and commits with a single parent, merges are given by the commit graph.
+    Commits reachable from the excluded commit are skipped.
+    """
+    READ_SIZE = 1 << 16
+
+    def __init__(self, repo: Repo, branch: str, graph: GitCommitGraph, exclude: Union[bytes, None] = None):
+        self.repo = repo
+        self.branch = branch
+        self.graph = graph
+        self.exclude = exclude
+
+    def tokens(self, stream):
+        """
+        the output is NUL-separated (-z), so paths are neither quoted nor escaped
+        """
+        rest = b''
+        while chunk := stream.read(self.READ_SIZE):
+            tokens = (rest + chunk).split(b'\0')
+            rest = tokens.pop()
+            yield from tokens
+        yield rest
+
+    def merge_parent(self, binsha: bytes, header: list[bytes]):
+        """
+        git marks the diff of a merge commit with `(from <parent>)` in front of the subject, however the subject of any
+        commit can start with the same text. The marker is only accepted for merge commits and one of their parents.
+        """
+        idx = self.graph.index.get(binsha)
+        if idx is None or self.graph.parent_count(idx) < 2:
+            return None
+        if len(header) < 3 or header[1] != b'(from' or not header[2].endswith(b')'):
+            return None
+        for parent in self.graph.parents(idx):
+            if bin_to_hex(self.graph.binshas[parent]) == header[2][:-1]:
+                return self.graph.binshas[parent]
+        return None
+
+    def __iter__(self):
+        process = self.repo.git.log(
+            '-z', '--pretty=oneline', '--no-abbrev-commit', '--no-decorate', '--no-color',
+            '--raw', '-m', '--root', '--no-renames', '--no-abbrev', self.branch,
+            *([f'^{bin_to_hex(self.exclude).decode()}'] if self.exclude else []), '--',
+            as_process=True
+        )
+
+        binsha, parent_binsha, changes = None, None, []
+        tokens = self.tokens(process.stdout)
+        for token in tokens:
+            if token.startswith(b':'):
+                # :<old mode> <new mode> <old blob> <new blob> <status>, followed by the path
+                meta = token[1:].split()
+                changes.append(GitFileChange(meta[4].decode(), safe_decode(next(tokens)), meta[2].decode(),
+                                             meta[3].decode()))
+                continue
+
+            header = token.strip().split(maxsplit=3)
+            if not header:
+                continue
+            if binsha is not None:
+                yield binsha, parent_binsha, changes
+
+            # <commit> [(from <parent>)] <subject>
+            binsha, changes = hex_to_bin(header[0]), []
+            parent_binsha = self.merge_parent(binsha, header)
+
+        if binsha is not None:
+            yield binsha, parent_binsha, changes
+        process.wait()
@@ -3,7 +3,7 @@ import git
 from .file import GitFile
 from .textline import Textline
 from .commit_statistic import GitCommitStatistic as GitCStats
-import copy
+from .snapshot import GitFileSnapshot
 from enum import Enum
 
 class GitCommitStatus(Enum):
@@ -13,12 +13,13 @@ class GitCommitStatus(Enum):
 class GitCommit:
     def __init__(self, commit: git.Commit):
         self.commit: git.Commit = commit
+        self.index = -1
         self.children = 0
         self.remaining_children = 0
         self.status = GitCommitStatus.UNVISITED
         self.parents = []
 
-        self.files: dict[str, GitFile] = {}
+        self.files: GitFileSnapshot = GitFileSnapshot()
         self.added_files = []
         self.copied_files = []
         self.deleted_files = []
@@ -43,11 +44,9 @@ class GitCommit:
     def update_files(self, old_commit, new_files):
         """
         splitting the changes in their different types
+        the files of the parent are shared, only the changed files are replaced
         """
-        if old_commit.remaining_children > 0:
-            self.files: dict[str, GitFile] = copy.deepcopy(old_commit.files)
-        else:
-            self.files: dict[str, GitFile] = old_commit.files.copy()
+        self.files: GitFileSnapshot = old_commit.files.copy()
         for f in new_files:
             assert f[0] == 'A' or f[0] == 'D' or f[0] == 'M', "unexpected mode from git"
             if f[0] == 'A':
@@ -77,17 +76,14 @@ class GitCommit:
         for f in filenames_2:
             assert filenames_2[f] == 'A' or filenames_2[f] == 'D' or filenames_2[f] == 'M'
 
-        if parent_1.remaining_children > 0:
-            self.files: dict[str, GitFile] = copy.deepcopy(parent_1.files)
-        else:
-            self.files: dict[str, GitFile] = parent_1.files.copy()
+        self.files: GitFileSnapshot = parent_1.files.copy()
 
         files_to_update = []
-        for filename in \
-                set(list(self.files.keys()) + list(parent_2.files.keys()) + list(filenames_1) + list(filenames_2)):
+        filenames = set(list(self.files.keys()) + list(parent_2.files.keys()) + list(filenames_1) + list(filenames_2))
+        for filename in sorted(filenames):
             if filename not in filenames_1 and filename not in filenames_2:
                 if parent_2.files[filename].history[-1] not in parent_1.files[filename].history:
-                    self.files[filename] = copy.deepcopy(parent_2.files[filename])
+                    self.files[filename] = parent_2.files[filename]
                 continue
             if filename not in filenames_1 and filename in filenames_2:
                 # parent_1 has the latest version
@@ -97,7 +93,7 @@ class GitCommit:
                 if filenames_1[filename] == 'D':
                     self.files.pop(filename)
                 else:
-                    self.files[filename] = copy.deepcopy(parent_2.files[filename])
+                    self.files[filename] = parent_2.files[filename]
                 continue
             assert filename in filenames_1 and filename in filenames_2, "WTF..."
 
@@ -137,10 +133,32 @@ class GitCommit:
 
         return files_to_update
 
-    def add_file(self, filename: str, file, config, add_too=False):
+    def add_file(self, filename: str, file, config, add_too=False, line_data=None, blob=None):
         if add_too:
             self.added_files.append(filename)
-        self.files[filename] = GitFile(file, self.commit.binsha, config)
+        self.files[filename] = GitFile(file, self.commit.binsha, config, line_data, blob)
+
+    def add_files(self, blobs: dict[str, str], blob_reader, line_cache, config, add_too=False):
+        """
+        adds the files (filename -> blob id), blobs which are not in the line cache are read with a single pipelined
+        request and parsed only once
+        """
+        line_data = {}
+        for blob in blobs.values():
+            if blob not in line_data:
+                line_data[blob] = line_cache.get(blob)
+
+        missing = [blob for blob, data in line_data.items() if data is None]
+        contents = dict(zip(missing, blob_reader.read_blobs(missing)))
+        for filename, blob in blobs.items():
+            if line_data[blob] is not None:
+                self.add_file(filename, None, config, add_too, line_data[blob], blob)
+                continue
+
+            self.add_file(filename, contents[blob], config, add_too, blob=blob)
+            if line_cache.enabled:
+                line_data[blob] = self.files[filename].line_data()
+                line_cache.put(blob, line_data[blob])
 
     def print_statistics(self):
         print(f"Commit: {self.commit.binsha.hex()}, merge: {len(self.commit.parents) > 1}")
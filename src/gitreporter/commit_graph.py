@@ -0,0 +1,103 @@
+from array import array
+from collections import deque
+
+from git import Repo
+from git.util import hex_to_bin
+
+
+class GitCommitGraph:
+    """
+    Compact representation of the commit DAG of a branch.
+    Commits are addressed by their index in the rev-list order, parent and child adjacency is stored as flat integer
+    arrays with offsets (CSR layout).
+    """
+    def __init__(self, repo: Repo, branch: str):
+        self.binshas: list[bytes] = []
+        self.index: dict[bytes, int] = {}
+
+        self.parent_offsets = array('q', [0])
+        self.parent_indices = array('q')
+        self.child_offsets = array('q', [0])
+        self.child_indices = array('q')
+        self.generations = array('q')
+
+        self.build(repo, branch)
+
+    def __len__(self):
+        return len(self.binshas)
+
+    def build(self, repo: Repo, branch: str):
+        """
+        Reads the commits with a single streamed `git rev-list --parents` call and creates the adjacency arrays.
+        """
+        parent_binshas: list[bytes] = []
+
+        process = repo.git.rev_list('--parents', branch, '--', as_process=True)
+        for raw_line in process.stdout:
+            shas = raw_line.split()
+            if not shas:
+                continue
+            binsha = hex_to_bin(shas[0])
+            self.index[binsha] = len(self.binshas)
+            self.binshas.append(binsha)
+            parent_binshas += [hex_to_bin(sha) for sha in shas[1:]]
+            self.parent_offsets.append(len(parent_binshas))
+        process.wait()
+
+        for binsha in parent_binshas:
+            assert binsha in self.index, "Could not find a parent, although it must exist"
+            self.parent_indices.append(self.index[binsha])
+
+        self.build_children()
+        self.build_generations()
+
+    def build_children(self):
+        """
+        counting sort of the parent edges, such that the children of every commit are stored contiguously
+        """
+        counts = array('q', bytes(8 * (len(self) + 1)))
+        for parent in self.parent_indices:
+            counts[parent + 1] += 1
+        for idx in range(len(self)):
+            counts[idx + 1] += counts[idx]
+
+        self.child_offsets = array('q', counts)
+        self.child_indices = array('q', bytes(8 * len(self.parent_indices)))
+        for child in range(len(self)):
+            for parent in self.parents(child):
+                self.child_indices[counts[parent]] = child
+                counts[parent] += 1
+
+    def build_generations(self):
+        """
+        generation number of a root commit is 1, every other commit has the maximum generation of its parents plus 1
+        """
+        self.generations = array('q', bytes(8 * len(self)))
+        missing_parents = array('q', [self.parent_count(idx) for idx in range(len(self))])
+        queue = deque(self.roots())
+        while queue:
+            idx = queue.popleft()
+            self.generations[idx] += 1
+            for child in self.children(idx):
+                self.generations[child] = max(self.generations[child], self.generations[idx])
+                missing_parents[child] -= 1
+                if not missing_parents[child]:
+                    queue.append(child)
+
+    def parents(self, idx: int):
+        return self.parent_indices[self.parent_offsets[idx]:self.parent_offsets[idx + 1]]
+
+    def parent_count(self, idx: int):
+        return self.parent_offsets[idx + 1] - self.parent_offsets[idx]
+
+    def children(self, idx: int):
+        return self.child_indices[self.child_offsets[idx]:self.child_offsets[idx + 1]]
+
+    def child_count(self, idx: int):
+        return self.child_offsets[idx + 1] - self.child_offsets[idx]
+
+    def roots(self):
+        return [idx for idx in range(len(self)) if not self.parent_count(idx)]
+
+    def generation(self, idx: int):
+        return self.generations[idx]
@@ -0,0 +1,37 @@
+from .commit import GitCommit
+from .config import Config
+from .history import GitCommitIds
+
+
+class GitCommitTable:
+    """
+    Lookup table for the attribution of lines, it is built once per run and indexed by the ids of GitCommitIds.
+    For every commit the author email, the admissibility and whether it is inside the time interval are stored.
+    """
+    def __init__(self, config: Config, commit_list: list[GitCommit]):
+        size = max((GitCommitIds.get_id(commit.commit.binsha) for commit in commit_list), default=-1) + 1
+        self.emails: list = [None] * size
+        self.admissible = bytearray(size)
+        self.in_time_interval = bytearray(size)
+
+        for commit in commit_list:
+            commit_id = GitCommitIds.get_id(commit.commit.binsha)
+            self.emails[commit_id] = commit.commit.author.email
+            self.admissible[commit_id] = config.check_commit_admissible(commit)
+            self.in_time_interval[commit_id] = config.in_time_interval(commit.commit.committed_datetime)
+
+    def admissible_author(self, commit_id: int):
+        """
+        returns the author email if the commit is admissible, otherwise None
+        """
+        if commit_id < len(self.emails) and self.admissible[commit_id]:
+            return self.emails[commit_id]
+        return None
+
+    def author_in_time_interval(self, commit_id: int):
+        """
+        returns the author email if the commit is inside the time interval, otherwise None
+        """
+        if commit_id < len(self.emails) and self.in_time_interval[commit_id]:
+            return self.emails[commit_id]
+        return None
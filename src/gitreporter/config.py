@@ -1,5 +1,6 @@
 import copy
 import json
+import hashlib
 import argparse
 from datetime import datetime
 from typing import Union
@@ -22,13 +23,32 @@ class Config:
         "hard-end-date": None,
         "diff-recursion-depth": 2,
         "diff-recursion-block-size-threshold": 4,
+        "diff-algorithm": "difflib",
         "allow-modifications": False,
         "modification-similarity": 0.8,
         "modification-minimum-line-length": 2,
         "comments-and-coding-standard": False,
-        "json": False
+        "detect-moved-code": False,
+        "workers": 1,
+        "cache": False,
+        "cache-dir": None,
+        "memory-bounded": False,
+        "memory-budget": None,
+        "line-cache-size": 1000000,
+        "line-cache-dir": None,
+        "diff-cache-dir": None,
+        "json": False,
+        "ndjson": False,
+        "ndjson-gzip": False,
+        "lazy-line-mapping": False
     }
 
+    # options, which have no influence on the analysis of the commits (only on the report or the runtime)
+    REPORT_OPTIONS = ["repo", "author-whitelist", "author-blacklist", "start-date", "end-date", "hard-end-date",
+                      "workers", "cache", "cache-dir", "memory-bounded", "memory-budget", "line-cache-size",
+                      "line-cache-dir", "diff-cache-dir", "json", "ndjson", "ndjson-gzip",
+                      "lazy-line-mapping"]
+
     def __init__(self, options: Union[dict, None]=None):
         self.options = options \
             if options \
@@ -52,7 +72,23 @@ class Config:
                 case "diff-recursion-depth" | "diff-recursion-block-size-threshold" | "modification-minimum-line-length":
                     if type(value) != int and type <= 0:
                         raise ConfigException(f"error: invalid type/value for {key}.")
-                case "allow-modifications" | "comments-and-coding-standard" | "json":
+                case "diff-algorithm":
+                    if value not in ["difflib", "histogram"]:
+                        raise ConfigException(f"error: invalid value for {key}.")
+                case "workers":
+                    if type(value) != int or value <= 0:
+                        raise ConfigException(f"error: invalid type/value for {key}.")
+                case "memory-budget":
+                    if value is not None and (type(value) != int or value <= 0):
+                        raise ConfigException(f"error: invalid type/value for {key}.")
+                case "line-cache-size":
+                    if type(value) != int or value < 0:
+                        raise ConfigException(f"error: invalid type/value for {key}.")
+                case "cache-dir" | "line-cache-dir" | "diff-cache-dir":
+                    if value is not None and type(value) != str:
+                        raise ConfigException(f"error: invalid type for {key}.")
+                case "allow-modifications" | "comments-and-coding-standard" | "detect-moved-code" | "cache" \
+                        | "memory-bounded" | "json" | "ndjson" | "ndjson-gzip" | "lazy-line-mapping":
                     if type(value) != bool:
                         raise ConfigException(f"error: invalid type for {key}.")
                 case "modification-similarity":
@@ -71,6 +107,14 @@ class Config:
             and commit.commit.author.email not in self.options["author-blacklist"] \
             and (not self.options["author-whitelist"] or commit.commit.author.email in self.options["author-whitelist"])
 
+    def analysis_fingerprint(self):
+        """
+        hash of all options, which influence the analysis of the commits
+        """
+        options = {key: value for key, value in self.get_options_with_datetime_string().items()
+                   if key not in self.REPORT_OPTIONS}
+        return hashlib.sha256(json.dumps(options, sort_keys=True).encode('utf-8')).hexdigest()
+
     def get_options_with_datetime_string(self):
         options = copy.copy(self.options)
 
@@ -1,23 +1,29 @@
 from .commit import GitCommit
+from array import array
 from difflib import SequenceMatcher
 from .commit_statistic import GitCommitStatistic
-from .statistic_values import empty_value
 from .config import Config
+from .diff_cache import GitDiffCache
+from .diff_engine import DIFF_ENGINES
+from .modification_index import GitModificationIndex
+from .move_index import GitMovedCodeIndex
 from .textline import Textline
 
 
 class GitDiff:
-    def __init__(self, commit_a, commit_b: GitCommit, config, commit_a2 = None):
+    def __init__(self, commit_a, commit_b: GitCommit, config, commit_a2 = None, diff_cache: GitDiffCache = None):
         self.commit_a: GitCommit = commit_a
         self.commit_b: GitCommit = commit_b
         self.commit_a2 = commit_a2
         self.config: Config = config
+        self.diff_cache = diff_cache
+        self.engine = DIFF_ENGINES[config.options["diff-algorithm"]]()
 
     def compute_similarity(self, left, right):
         s = SequenceMatcher(a=left, b=right, autojunk=False)
         return s.ratio()
 
-    def compute_matched_lines(self, blocks, a, b, transfer_history, active_threshold):
+    def compute_matched_lines(self, blocks, a, b, transfer_history, active_threshold, matched_pairs=None):
         a_matched_lines = []
         b_matched_lines = []
         for block in blocks:
@@ -37,145 +43,222 @@ class GitDiff:
                 for i in range(block.a, block.a + block.size):
                     b[i - block.a + block.b].history = a[i].history
 
+            if matched_pairs is not None:
+                matched_pairs += zip(a[block.a:block.a + block.size], b[block.b:block.b + block.size])
+
         return a_matched_lines, b_matched_lines
 
     def lines_minus_matched_lines(self, text, matched_lines):
-        result = []
-        for i in range(len(text)):
-            if i not in matched_lines:
-                result.append(text[i])
-        return result
+        matched_lines = set(matched_lines)
+        return [line for i, line in enumerate(text) if i not in matched_lines]
 
-    def compute_unmatched_lines(self, a: list, b: list, transfer_history=False, across_files=False):
+    def compute_unmatched_lines(self, a: list, b: list, transfer_history=False, across_files=False,
+                                matched_pairs=None):
         for i in range(self.config.options["diff-recursion-depth"]):
-            s = SequenceMatcher(a=a, b=b, autojunk=False)
-            blocks = s.get_matching_blocks()
+            blocks = self.engine.matching_blocks(array('q', [line.content_id for line in a]),
+                                                 array('q', [line.content_id for line in b]))
 
             a_matched_lines, b_matched_lines = self.compute_matched_lines(blocks, a, b, transfer_history,
-                                                                          across_files or i > 0)
+                                                                          across_files or i > 0, matched_pairs)
             a = self.lines_minus_matched_lines(a, a_matched_lines)
             b = self.lines_minus_matched_lines(b, b_matched_lines)
 
         return a, b
 
-    def compute_modifications(self, a: list, b: list):
+    def compute_modifications(self, a: list, b: list, modification_pairs=None):
+        """
+        if modification_pairs is given, the positions of the modified lines in a and b are appended
+        """
         deletions = []
         insertions = []
         ins_mod = []
+        ins_mod_positions = []
         modifications = []
 
-        for b_line in b:
+        for position, b_line in enumerate(b):
             if b_line.length_wo_whitespace() < self.config.options["modification-minimum-line-length"]:
                 insertions.append(b_line)
             else:
                 ins_mod.append(b_line)
+                ins_mod_positions.append(position)
 
-        for a_line in a:
+        index = GitModificationIndex(ins_mod)
+        for position, a_line in enumerate(a):
             if a_line.length_wo_whitespace() < self.config.options["modification-minimum-line-length"]:
                 deletions.append(a_line)
                 continue
 
-            for i in range(len(ins_mod)):
-                similarity = self.compute_similarity(a_line.to_string(), ins_mod[i].to_string())
+            a_string = a_line.to_string()
+            for i in index.candidates(a_string, self.config.options["modification-similarity"]):
+                similarity = self.compute_similarity(a_string, index.strings[i])
                 if similarity >= self.config.options["modification-similarity"]:
                     ins_mod[i].add_history(a_line.history)
-                    ins_mod = ins_mod[:i] + ins_mod[i+1:]
+                    index.remove(i)
                     modifications.append(a_line)
+                    if modification_pairs is not None:
+                        modification_pairs.append((position, ins_mod_positions[i]))
                     break
             else:
                 deletions.append(a_line)
 
-        return deletions, insertions + ins_mod, modifications
+        return deletions, insertions + index.remaining_lines(), modifications
+
+    def replay_modifications(self, a: list, b: list, modification_pairs):
+        """
+        same result as compute_modifications, the modified lines are taken from a cached diff
+        """
+        a_modified = set()
+        b_modified = set()
+        modifications = []
+        for i, j in modification_pairs:
+            b[j].add_history(a[i].history)
+            modifications.append(a[i])
+            a_modified.add(i)
+            b_modified.add(j)
+
+        return self.lines_minus_matched_lines(a, a_modified), self.lines_minus_matched_lines(b, b_modified), \
+            modifications
+
+    def cached_blobs(self, file_a, file_b):
+        """
+        returns the key of the diff cache or None, if the diff cannot be cached
+        """
+        if self.diff_cache is None or not self.diff_cache.enabled or file_a.blob is None or file_b.blob is None:
+            return None
+        return file_a.blob, file_b.blob
 
     def handle_modified_files(self, filename, commit):
+        """
+        The diff of both versions is taken from the diff cache, if possible. The last element of the result is the
+        cached diff (blob ids, entry, whether the entry has to be stored) or None.
+        """
         self.commit_b.files[filename].add_history(commit.files[filename].history)
-        deletions, insertions = self.compute_unmatched_lines(list(commit.files[filename].lines),
-                                                             list(self.commit_b.files[filename].lines),
-                                                             transfer_history=True)
-        if not self.config.options['allow-modifications']:
-            self.commit_b.statistics.add_file(
-                filename=filename,
-                insertions=Textline.evaluate_lines(insertions),
-                deletions=Textline.evaluate_lines(deletions),
-                modifications=empty_value()
-            )
+        a = list(commit.files[filename].lines)
+        b = list(self.commit_b.files[filename].lines)
+
+        blobs = self.cached_blobs(commit.files[filename], self.commit_b.files[filename])
+        entry = self.diff_cache.get(*blobs) if blobs else None
+        if entry is not None:
+            for i, j in GitDiffCache.pairs(entry['matches']):
+                b[j].history = a[i].history
+            deletions = [a[i] for i in entry['deletions']]
+            insertions = [b[j] for j in entry['insertions']]
+            cached_diff = blobs, entry, False
         else:
-            deletions, insertions, modifications = self.compute_modifications(deletions, insertions)
-            self.commit_b.statistics.add_file(
-                filename=filename,
-                insertions=Textline.evaluate_lines(insertions),
-                deletions=Textline.evaluate_lines(deletions),
-                modifications=Textline.evaluate_lines(modifications)
-            )
+            matched_pairs = [] if blobs else None
+            deletions, insertions = self.compute_unmatched_lines(a, b, transfer_history=True,
+                                                                 matched_pairs=matched_pairs)
+            cached_diff = None
+            if blobs:
+                a_positions = {id(line): i for i, line in enumerate(a)}
+                b_positions = {id(line): j for j, line in enumerate(b)}
+                entry = GitDiffCache.create_entry(
+                    [(a_positions[id(a_line)], b_positions[id(b_line)]) for a_line, b_line in matched_pairs],
+                    [a_positions[id(line)] for line in deletions], [b_positions[id(line)] for line in insertions])
+                cached_diff = blobs, entry, True
+
+        return filename, deletions, insertions, self.config.options['allow-modifications'], cached_diff
+
+    def handle_merge_file(self, filename):
+        self.commit_b.files[filename].merge_histories(self.commit_a.files[filename].history,
+                                                      self.commit_a2.files[filename].history)
+        parent_1_unmatched_lines, child_p1_unmatched_lines = \
+            self.compute_unmatched_lines(list(self.commit_a.files[filename].lines),
+                                         list(self.commit_b.files[filename].lines),
+                                         transfer_history=True)
+
+        parent_2_unmatched_lines, _ = \
+            self.compute_unmatched_lines(list(self.commit_a2.files[filename].lines),
+                                         list(self.commit_b.files[filename].lines))
+
+        """
+        # compute insertions iteratively
+        """
+        _, insertions = \
+            self.compute_unmatched_lines(list(self.commit_a2.files[filename].lines),
+                                         list(child_p1_unmatched_lines),
+                                         transfer_history=True)
+
+        """
+        # deletions are the symmetric difference of parent_1 and parent_2
+        """
+        parent_1_deletions, parent_2_deletions = \
+            self.compute_unmatched_lines(list(parent_1_unmatched_lines), list(parent_2_unmatched_lines))
+
+        return filename, parent_1_deletions + parent_2_deletions, insertions, False, None
+
+    def detect_moved_code(self, changes):
+        """
+        matches the remaining insertions of all files with the remaining deletions of all files
+        the modifications depend on other files now, therefore only the diffs of the files are cached
+        """
+        index = GitMovedCodeIndex([deletions for _, deletions, _, _, _ in changes],
+                                  self.config.options["diff-recursion-block-size-threshold"])
+        remaining_insertions = []
+        for _, _, insertions, _, cached_diff in changes:
+            matched_insertions = index.match(insertions)
+            remaining_insertions.append([line for i, line in enumerate(insertions) if i not in matched_insertions])
+            if cached_diff is not None and cached_diff[2]:
+                self.diff_cache.put(*cached_diff[0], cached_diff[1])
+
+        return [(filename, index.remaining_deletions(idx), remaining_insertions[idx], allow_modifications, None)
+                for idx, (filename, _, _, allow_modifications, _) in enumerate(changes)]
+
+    def add_statistics(self, filename, deletions, insertions, allow_modifications, cached_diff=None):
+        modifications = []
+        if allow_modifications and cached_diff is not None and cached_diff[1]['modifications'] is not None:
+            modification_pairs = GitDiffCache.pairs(cached_diff[1]['modifications'])
+            deletions, insertions, modifications = self.replay_modifications(deletions, insertions, modification_pairs)
+        elif allow_modifications:
+            modification_pairs = [] if cached_diff is not None else None
+            deletions, insertions, modifications = self.compute_modifications(deletions, insertions,
+                                                                              modification_pairs)
+            if cached_diff is not None:
+                blobs, entry, _ = cached_diff
+                GitDiffCache.add_modifications(entry, modification_pairs)
+                cached_diff = blobs, entry, True
+
+        if cached_diff is not None and cached_diff[2]:
+            self.diff_cache.put(*cached_diff[0], cached_diff[1])
+        self.commit_b.statistics.add_file(
+            filename=filename,
+            insertions=Textline.evaluate_lines(insertions),
+            deletions=Textline.evaluate_lines(deletions),
+            modifications=Textline.evaluate_lines(modifications)
+        )
 
     def compute_diff(self):
         """
-        compute the diff, without considering diffs between different files
+        compute the diff, without considering diffs between different files (unless moved code is detected)
         """
+        # (filename, deletions, insertions, allow modifications, cached diff) in the order of the statistics
+        changes = []
 
         for file in self.commit_b.added_files:
-            self.commit_b.statistics.add_file(
-                filename=file,
-                insertions=Textline.evaluate_lines(self.commit_b.files[file].lines),
-                deletions=empty_value(),
-                modifications=empty_value()
-            )
+            changes.append((file, [], list(self.commit_b.files[file].lines), False, None))
 
         for file in self.commit_b.deleted_files:
-            self.commit_b.statistics.add_file(
-                filename=file,
-                insertions=empty_value(),
-                deletions=Textline.evaluate_lines(self.commit_a.files[file].lines),
-                modifications=empty_value()
-            )
+            changes.append((file, list(self.commit_a.files[file].lines), [], False, None))
 
         for filename in self.commit_b.modified_files:
-            self.handle_modified_files(filename, self.commit_a)
+            changes.append(self.handle_modified_files(filename, self.commit_a))
 
         if self.commit_a2:
             for file in self.commit_b.deleted_files_p2:
-                self.commit_b.statistics.add_file(
-                    filename=file,
-                    insertions=Textline.evaluate_lines(self.commit_a2.files[file].lines),
-                    deletions=empty_value(),
-                    modifications=empty_value()
-                )
+                changes.append((file, [], list(self.commit_a2.files[file].lines), False, None))
 
             for filename in self.commit_b.modified_files_p2:
-                self.handle_modified_files(filename, self.commit_a2)
+                changes.append(self.handle_modified_files(filename, self.commit_a2))
 
         for filename in self.commit_b.merge_files:
-            self.commit_b.files[filename].merge_histories(self.commit_a.files[filename].history,
-                                                          self.commit_a2.files[filename].history)
-            parent_1_unmatched_lines, child_p1_unmatched_lines = \
-                self.compute_unmatched_lines(list(self.commit_a.files[filename].lines),
-                                             list(self.commit_b.files[filename].lines),
-                                             transfer_history=True)
+            changes.append(self.handle_merge_file(filename))
 
-            parent_2_unmatched_lines, _ = \
-                self.compute_unmatched_lines(list(self.commit_a2.files[filename].lines),
-                                             list(self.commit_b.files[filename].lines))
+        # moved code is only detected between a commit and its single parent
+        if self.config.options["detect-moved-code"] and not self.commit_a2:
+            changes = self.detect_moved_code(changes)
 
-            """
-            # compute insertions iteratively
-            """
-            _, insertions = \
-                self.compute_unmatched_lines(list(self.commit_a2.files[filename].lines),
-                                             list(child_p1_unmatched_lines),
-                                             transfer_history=True)
-
-            """
-            # deletions are the symmetric difference of parent_1 and parent_2
-            """
-            parent_1_deletions, parent_2_deletions = \
-                self.compute_unmatched_lines(list(parent_1_unmatched_lines), list(parent_2_unmatched_lines))
-
-            self.commit_b.statistics.add_file(
-                filename=filename,
-                insertions=Textline.evaluate_lines(insertions),
-                deletions=Textline.evaluate_lines(parent_1_deletions + parent_2_deletions),
-                modifications=empty_value()
-            )
+        for change in changes:
+            self.add_statistics(*change)
 
     def create_diff(self):
         """
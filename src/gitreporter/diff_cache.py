@@ -0,0 +1,77 @@
+import hashlib
+import json
+import os
+import pickle
+from array import array
+
+from .config import Config
+
+
+class GitDiffCache:
+    """
+    Content addressed on-disk cache of the diffs of modified files. The key consists of the blob ids of both versions
+    and all options which change the diff, therefore an entry is valid for every commit and every repository.
+    An entry stores positions only: the matched lines (pairs of old and new position), the unmatched lines and the
+    modifications (pairs of positions within the unmatched lines). The histories are transferred by replaying them.
+    """
+    VERSION = 2
+    OPTIONS = ["diff-recursion-depth", "diff-recursion-block-size-threshold", "diff-algorithm", "allow-modifications",
+               "modification-similarity", "modification-minimum-line-length", "comments-and-coding-standard"]
+
+    def __init__(self, config: Config):
+        self.directory = config.options["diff-cache-dir"]
+        self.enabled = self.directory is not None
+        self.options = json.dumps([config.options[option] for option in self.OPTIONS])
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, old_blob: str, new_blob: str):
+        key = hashlib.sha256(f'{old_blob}:{new_blob}:{self.options}:{self.VERSION}'.encode()).hexdigest()
+        return os.path.join(self.directory, key[:2], f'{key}.diff')
+
+    def get(self, old_blob: str, new_blob: str):
+        """
+        returns the entry of the blob pair or None
+        """
+        try:
+            with open(self.path(old_blob, new_blob), 'rb') as f:
+                entry = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def put(self, old_blob: str, new_blob: str, entry: dict):
+        path = self.path(old_blob, new_blob)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f'{path}.{os.getpid()}.tmp', 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f'{path}.{os.getpid()}.tmp', path)
+
+    @staticmethod
+    def create_entry(matched_pairs: list[tuple[int, int]], deletions: list[int], insertions: list[int]):
+        """
+        the modifications are added later (see add_modifications), they are None as long as they are not computed
+        """
+        return {
+            'matches': GitDiffCache.flatten(matched_pairs),
+            'deletions': array('l', deletions),
+            'insertions': array('l', insertions),
+            'modifications': None,
+        }
+
+    @staticmethod
+    def add_modifications(entry: dict, modification_pairs: list[tuple[int, int]]):
+        entry['modifications'] = GitDiffCache.flatten(modification_pairs)
+
+    @staticmethod
+    def flatten(pairs: list[tuple[int, int]]):
+        return array('l', [position for pair in pairs for position in pair])
+
+    @staticmethod
+    def pairs(positions: array):
+        return zip(positions[0::2], positions[1::2])
@@ -0,0 +1,159 @@
+from array import array
+from difflib import SequenceMatcher, Match
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class GitDiffEngine:
+    """
+    base of the line diff engines, the lines are compared by their content ids
+    """
+    # minimum region size for which the common prefix and suffix are computed with numpy
+    VECTORIZE_THRESHOLD = 64
+
+    def common_length(self, a, b, a_low: int, b_low: int, length: int, reverse: bool = False):
+        """
+        length of the common prefix of a[a_low:] and b[b_low:] (or common suffix of a[:a_low] and b[:b_low])
+        """
+        if numpy is not None and length >= self.VECTORIZE_THRESHOLD \
+                and isinstance(a, array) and isinstance(b, array) and a.typecode == b.typecode:
+            a_values = numpy.frombuffer(a, dtype=a.typecode)
+            b_values = numpy.frombuffer(b, dtype=b.typecode)
+            if reverse:
+                different = a_values[a_low - length:a_low][::-1] != b_values[b_low - length:b_low][::-1]
+            else:
+                different = a_values[a_low:a_low + length] != b_values[b_low:b_low + length]
+            mismatches = numpy.flatnonzero(different)
+            return int(mismatches[0]) if mismatches.size else length
+
+        step = -1 if reverse else 1
+        i, j = (a_low - 1, b_low - 1) if reverse else (a_low, b_low)
+        common = 0
+        while common < length and a[i] == b[j]:
+            common += 1
+            i += step
+            j += step
+        return common
+
+
+class GitSequenceMatcherEngine(GitDiffEngine):
+    """
+    line diff of difflib, finds the longest matching blocks recursively (quadratic for many repeated lines)
+    the common prefix and suffix are matched first, only the lines in between are diffed by difflib
+    """
+    def matching_blocks(self, a: list, b: list) -> list[Match]:
+        prefix = self.common_length(a, b, 0, 0, min(len(a), len(b)))
+        suffix = self.common_length(a, b, len(a), len(b), min(len(a), len(b)) - prefix, reverse=True)
+
+        blocks = [Match(0, 0, prefix)] if prefix else []
+        blocks += [Match(block.a + prefix, block.b + prefix, block.size) for block in
+                   SequenceMatcher(a=a[prefix:len(a) - suffix], b=b[prefix:len(b) - suffix], autojunk=False)
+                   .get_matching_blocks() if block.size]
+        if suffix:
+            blocks.append(Match(len(a) - suffix, len(b) - suffix, suffix))
+        blocks.append(Match(len(a), len(b), 0))
+        return blocks
+
+
+class GitHistogramEngine(GitDiffEngine):
+    """
+    Histogram line diff (like git diff --histogram): the matching region is anchored at the lines with the lowest number
+    of occurrences in a and extended in both directions, the regions before and after it are diffed the same way.
+    Regions which only contain lines with more than MAX_CHAIN_LENGTH occurrences are diffed with difflib.
+    The result has the same format as SequenceMatcher.get_matching_blocks.
+    """
+    MAX_CHAIN_LENGTH = 64
+
+    def find_region(self, a: list, b: list, a_low: int, a_high: int, b_low: int, b_high: int):
+        """
+        returns (i, j, size) of the best matching region, or None if there is no anchor
+        """
+        occurrences = {}
+        for i in range(a_low, a_high):
+            occurrences.setdefault(a[i], []).append(i)
+
+        best = None
+        best_count = self.MAX_CHAIN_LENGTH + 1
+        j = b_low
+        while j < b_high:
+            positions = occurrences.get(b[j])
+            if positions is None or len(positions) > min(best_count, self.MAX_CHAIN_LENGTH):
+                j += 1
+                continue
+
+            next_j = j + 1
+            for i in positions:
+                if best is not None and best[0] <= i < best[0] + best[2] and best[1] <= j < best[1] + best[2] \
+                        and i - best[0] == j - best[1]:
+                    continue
+                start = 0
+                while i - start > a_low and j - start > b_low and a[i - start - 1] == b[j - start - 1]:
+                    start += 1
+                end = 1
+                while i + end < a_high and j + end < b_high and a[i + end] == b[j + end]:
+                    end += 1
+
+                count = min(len(occurrences[a[k]]) for k in range(i - start, i + end))
+                size = start + end
+                if count < best_count or (count == best_count and size > best[2]):
+                    best = (i - start, j - start, size)
+                    best_count = count
+                next_j = max(next_j, j + end)
+            j = next_j
+
+        return best
+
+    def matching_blocks(self, a: list, b: list) -> list[Match]:
+        blocks = []
+        regions = [(0, len(a), 0, len(b))]
+        while regions:
+            a_low, a_high, b_low, b_high = regions.pop()
+
+            # common prefix and suffix
+            prefix = self.common_length(a, b, a_low, b_low, min(a_high - a_low, b_high - b_low))
+            if prefix:
+                blocks.append((a_low, b_low, prefix))
+                a_low += prefix
+                b_low += prefix
+            suffix = self.common_length(a, b, a_high, b_high, min(a_high - a_low, b_high - b_low), reverse=True)
+            if suffix:
+                blocks.append((a_high - suffix, b_high - suffix, suffix))
+                a_high -= suffix
+                b_high -= suffix
+
+            if a_low == a_high or b_low == b_high:
+                continue
+
+            region = self.find_region(a, b, a_low, a_high, b_low, b_high)
+            if region is None:
+                if not set(a[a_low:a_high]).isdisjoint(b[b_low:b_high]):
+                    # only lines with too many occurrences match
+                    blocks += [(block.a + a_low, block.b + b_low, block.size) for block in
+                               SequenceMatcher(a=a[a_low:a_high], b=b[b_low:b_high], autojunk=False)
+                               .get_matching_blocks() if block.size]
+                continue
+
+            i, j, size = region
+            blocks.append(region)
+            regions.append((a_low, i, b_low, j))
+            regions.append((i + size, a_high, j + size, b_high))
+
+        # adjacent blocks are joined like in SequenceMatcher
+        blocks.sort()
+        result = []
+        for i, j, size in blocks:
+            if result and result[-1].a + result[-1].size == i and result[-1].b + result[-1].size == j:
+                result[-1] = Match(result[-1].a, result[-1].b, result[-1].size + size)
+            else:
+                result.append(Match(i, j, size))
+        result.append(Match(len(a), len(b), 0))
+        return result
+
+
+DIFF_ENGINES = {
+    "difflib": GitSequenceMatcherEngine,
+    "histogram": GitHistogramEngine
+}
@@ -0,0 +1,63 @@
+import gzip
+import json
+
+from .commit import GitCommit, GitCommitStatus
+from .commit_table import GitCommitTable
+from .config import Config
+from .history import GitCommitIds
+from .repository_statistic import GitRepositoryStatistic
+from .statistic_values import LINE_CATEGORIES
+
+
+class GitNDJSONExporter:
+    """
+    Streams the statistics as newline delimited json, one record per line. The records are written while they are
+    created, therefore the memory does not depend on the size of the output. Records are:
+    - commit-file: values of a file changed by an admissible commit
+    - author-file: statistic of an author for a file
+    - line: origin of a line of the tip commit (the author is None if the commit is not admissible)
+    """
+    def __init__(self, config: Config, statistics: GitRepositoryStatistic, commit_list: list[GitCommit],
+                 commit_table: GitCommitTable):
+        self.config = config
+        self.statistics = statistics
+        self.commit_list = commit_list
+        self.commit_table = commit_table
+
+    def commit_file_records(self):
+        for commit in self.commit_list:
+            if commit.status != GitCommitStatus.VISITED or not self.config.check_commit_admissible(commit):
+                continue
+            record = {
+                'type': 'commit-file',
+                'commit': commit.commit.hexsha,
+                'author': commit.commit.author.email,
+                'date': commit.commit.committed_datetime.isoformat(),
+                'merge': len(commit.parents) > 1
+            }
+            for filename, values in commit.statistics.file_mapping.items():
+                yield record | {'file': filename, 'statistics': values.to_dict()}
+
+    def author_file_records(self):
+        for author, files in self.statistics.authors_per_file.items():
+            for filename, values in files.items():
+                yield {'type': 'author-file', 'author': author, 'file': filename, 'statistics': values.to_dict()}
+
+    def line_records(self):
+        for filename, attribution in self.statistics.attributions.items():
+            for idx, (commit_id, category) in enumerate(zip(attribution.commits, attribution.categories), start=1):
+                yield {
+                    'type': 'line',
+                    'file': filename,
+                    'line': idx,
+                    'commit': GitCommitIds.get_binsha(commit_id).hex(),
+                    'author': self.commit_table.admissible_author(commit_id),
+                    'category': LINE_CATEGORIES[category]
+                }
+
+    def write(self, path: str, compress=False):
+        with (gzip.open(path, 'wt', encoding='utf-8') if compress else open(path, 'w', encoding='utf-8')) as f:
+            for records in self.commit_file_records(), self.author_file_records(), self.line_records():
+                for record in records:
+                    f.write(json.dumps(record, separators=(',', ':')))
+                    f.write('\n')
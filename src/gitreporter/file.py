@@ -1,59 +1,31 @@
 from .textline import Textline
+from .history import GitHistory
 from .types import GitLineCategory as LineCategory
-
-from pygments.lexer import RegexLexer
-from pygments.token import *
-
-
-class CppCommentLexer(RegexLexer):
-    """
-    Citation: https://pygments.org/docs/lexerdevelopment/ [2023/02/27]
-    """
-    tokens = {
-        'root': [
-            (r'//.*?$', Comment.Singleline),
-            # . -> whatever char, *? -> greedy, as often as possible, -> $ -> stop before '\n
-            (r'/\*', Comment.Multiline, 'comment-ml'),
-            (r'/', Text),
-            (r"'", String.Char, 'char'),
-            (r'"', String, 'string'),
-            (r'\n', Text.Whitespace),
-            (r'[^\'"/\n]+', Text)
-        ],
-        'comment-ml': [
-            (r'\*/', Comment.Multiline, 'root'),
-            (r'\*', Comment.Multiline),
-            (r'\n', Text.Whitespace),
-            (r'[^\*\n]+', Comment.Multiline)
-        ],
-        'char': [
-            (r"\\.", String.Char),
-            (r"[^\\'\n]+", String.Char),
-            (r"\n", Text.Whitespace),
-            (r"'", String.Char, 'root')
-        ],
-        'string': [
-            (r'\\\n', Text.Whitespace),
-            (r'\\.', String),
-            (r'[^"\\\n]+', String),
-            (r"\n", Text.Whitespace),
-            (r'"', String, 'root'),
-        ]
-    }
+from .c_tokenizer import GitCTokenizer
 
 
 class GitFile:
-    def __init__(self, file, binsha, config):
-        self.history = [binsha]
+    def __init__(self, file, binsha, config, line_data=None, blob=None):
+        """
+        if line_data is given (see line_data()), the lines are not parsed again, only the history is new
+        """
+        self.history: GitHistory = GitHistory.create(binsha)
+        self.blob: str | None = blob
+
+        if line_data is not None:
+            self.lines = [Textline.restore(types, content, text, content_id, self.history)
+                          for types, content, text, content_id in line_data]
+            return
 
         if config.options['comments-and-coding-standard']:
-            self.lines = self.standardize_file(file, binsha)
+            self.lines = self.standardize_file(file, self.history)
         else:
-            self.lines = [Textline(LineCategory.UNKNOWN, line, binsha) for line in file.split('\n')]
+            self.lines = [Textline(LineCategory.UNKNOWN, line, self.history) for line in file.split('\n')]
 
         raw_lines = file.split('\n')
         for i in range(len(self.lines)):
             self.lines[i].add_text(raw_lines[i])
+            self.lines[i].update_content_id()
 
     """
     def __repr__(self):
@@ -64,15 +36,14 @@ class GitFile:
         return str
     """
 
-    def add_history(self, history):
-        self.history = history + self.history
+    def line_data(self):
+        return [(line.types, line.content, line.text, line.content_id) for line in self.lines]
+
+    def add_history(self, history: GitHistory):
+        self.history = self.history.prepend(history)
 
-    def merge_histories(self, history_1, history_2):
-        history = history_1[:]
-        for h in history_2:
-            if h not in history:
-                history.append(h)
-        self.history = history + self.history
+    def merge_histories(self, history_1: GitHistory, history_2: GitHistory):
+        self.history = self.history.prepend(history_1, history_2)
 
     """
     def blame(self):
@@ -82,49 +53,16 @@ class GitFile:
         print(str)
     """
 
-    def standardize_file(self, text: str, binsha):
-        tokens = CppCommentLexer().get_tokens_unprocessed(text)
+    def standardize_file(self, text: str, history: GitHistory):
         lines: list[Textline] = []
-        create_new = True
-
-        for token in tokens:
-            token_type = token[1]
-            # remove whitespace
-            text_without_ws = "".join(token[2].split())
-
-            if create_new:
-                if token_type is Token.Text.Whitespace:
-                    # we only have a newline
-                    lines.append(Textline(LineCategory.EMPTY, '', binsha))
-                elif not text_without_ws:
-                    # we continue with the next token
-                    continue
-                elif token_type is Token.Text or token_type is Token.String or token_type is Token.String.Char:
-                    # we have some non-whitespace code
-                    lines.append(Textline(LineCategory.CODE, text_without_ws, binsha))
-                    create_new = False
-                elif token_type is Token.Comment.Singleline or token_type is Token.Comment.Multiline:
-                    # we have a comment
-                    lines.append(Textline(LineCategory.COMMENT, text_without_ws, binsha))
-                    create_new = False
-                else:
-                    assert False, f'This code should be unreachable! We have type: {token_type}'
-            else:
-                if token_type is Token.Text.Whitespace:
-                    # we found the newline
-                    create_new = True
-                    lines[-1].update_symbols_only()
-                elif not text_without_ws:
-                    # we continue with the next token
-                    continue
-                elif token_type is Token.Text or token_type is Token.String or token_type is Token.String.Char:
-                    # we have some non-whitespace code
-                    lines[-1].add_token(LineCategory.CODE, text_without_ws)
-                elif token_type is Token.Comment.Singleline or token_type is Token.Comment.Multiline:
-                    lines[-1].add_token(LineCategory.COMMENT, text_without_ws)
-                else:
-                    assert False, f'This code should be unreachable! We have type: {token_type}, {text}'
+        for parts in GitCTokenizer(text).tokenize():
+            if not parts:
+                lines.append(Textline(LineCategory.EMPTY, '', history))
+                continue
 
-        if lines:
-            lines[-1].update_symbols_only()
+            line = Textline(parts[0][0], parts[0][1], history)
+            for token_type, content in parts[1:]:
+                line.add_token(token_type, content)
+            line.update_symbols_only()
+            lines.append(line)
         return lines
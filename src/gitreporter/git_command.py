@@ -0,0 +1,18 @@
+from git import Git, Repo
+
+
+class GitCountingCommand(Git):
+    """
+    git command wrapper, which counts how many git subprocesses are spawned
+    """
+    def __init__(self, working_dir=None):
+        super().__init__(working_dir)
+        self.spawned_processes = 0
+
+    def execute(self, command, *args, **kwargs):
+        self.spawned_processes += 1
+        return super().execute(command, *args, **kwargs)
+
+
+class GitCountingRepo(Repo):
+    GitCommandWrapperType = GitCountingCommand
@@ -0,0 +1,197 @@
+import weakref
+from array import array
+
+
+class GitCommitIds:
+    """
+    Process wide table, which maps the binsha of a commit to a compact integer id and back.
+    The generation numbers of the commit graph are stored as well (-1 if unknown).
+    """
+    binshas: list[bytes] = []
+    ids: dict[bytes, int] = {}
+    generations = array('q')
+
+    @classmethod
+    def get_id(cls, binsha: bytes) -> int:
+        commit_id = cls.ids.get(binsha)
+        if commit_id is None:
+            commit_id = len(cls.binshas)
+            cls.ids[binsha] = commit_id
+            cls.binshas.append(binsha)
+            cls.generations.append(-1)
+        return commit_id
+
+    @classmethod
+    def register(cls, binsha: bytes, generation: int) -> int:
+        commit_id = cls.get_id(binsha)
+        cls.generations[commit_id] = generation
+        return commit_id
+
+    @classmethod
+    def get_binsha(cls, commit_id: int) -> bytes:
+        return cls.binshas[commit_id]
+
+    @classmethod
+    def get_generation(cls, commit_id: int) -> int:
+        return cls.generations[commit_id]
+
+
+class GitHistory:
+    """
+    Immutable history of a line or a file version, it behaves like the list of binshas from the oldest to the newest
+    commit. A node stores the id of the newest commit and references the previous histories, such that histories are
+    shared instead of copied. Identical nodes are only created once.
+    history[0] (oldest commit) and history[-1] (newest commit) are O(1).
+
+    Every previous history belongs to an ancestor commit, therefore the generation numbers strictly decrease towards
+    the oldest commit. Nodes with a single previous history form linear segments, which have skew-binary jump
+    pointers, such that a commit is found in O(log n) within a segment.
+    """
+    __slots__ = ('commit_id', 'previous', 'first', 'generation', 'depth', 'jump', '__weakref__')
+
+    nodes = weakref.WeakValueDictionary()
+
+    def __init__(self, commit_id: int, previous: tuple):
+        self.commit_id = commit_id
+        self.previous = previous
+        self.first = previous[0].first if previous else commit_id
+        self.generation = GitCommitIds.get_generation(commit_id)
+
+        # depth and jump pointers are only defined within a linear segment
+        if len(previous) == 1:
+            parent = previous[0]
+            self.depth = parent.depth + 1
+            if parent.depth - parent.jump.depth == parent.jump.depth - parent.jump.jump.depth:
+                self.jump = parent.jump.jump
+            else:
+                self.jump = parent
+        else:
+            self.depth = 0
+            self.jump = self
+
+    @classmethod
+    def node(cls, commit_id: int, previous: tuple = ()):
+        key = (commit_id, *[id(history) for history in previous])
+        history = cls.nodes.get(key)
+        if history is None:
+            history = cls(commit_id, previous)
+            cls.nodes[key] = history
+        return history
+
+    @classmethod
+    def create(cls, binsha: bytes):
+        return cls.node(GitCommitIds.get_id(binsha))
+
+    @classmethod
+    def restore(cls, nodes: list[tuple[bytes, tuple]]):
+        """
+        nodes contains (binsha, indices of the previous nodes), previous nodes are stored before their successors
+        """
+        histories = []
+        for binsha, previous in nodes:
+            histories.append(cls.node(GitCommitIds.get_id(binsha), tuple(histories[idx] for idx in previous)))
+        return histories[-1]
+
+    def __reduce__(self):
+        # ids are only valid in the current process, therefore the binshas are stored
+        return GitHistory.restore, (self.serialize(),)
+
+    def serialize(self):
+        indices = {}
+        nodes = []
+        stack = [(self, False)]
+        while stack:
+            history, expanded = stack.pop()
+            if id(history) in indices:
+                continue
+            if expanded:
+                indices[id(history)] = len(nodes)
+                nodes.append((GitCommitIds.get_binsha(history.commit_id),
+                              tuple(indices[id(previous)] for previous in history.previous)))
+                continue
+            stack.append((history, True))
+            stack += [(previous, False) for previous in reversed(history.previous)]
+        return nodes
+
+    def prepend(self, *histories):
+        """
+        returns histories + self, if multiple histories are given, they are merged (duplicates are only kept once)
+        """
+        chain = [self]
+        while chain[-1].previous:
+            assert len(chain[-1].previous) == 1, "only linear histories can be extended"
+            chain.append(chain[-1].previous[0])
+
+        history = GitHistory.node(chain[-1].commit_id, histories)
+        for node in reversed(chain[:-1]):
+            history = GitHistory.node(node.commit_id, (history,))
+        return history
+
+    def commit_ids(self):
+        """
+        ids from the oldest to the newest commit
+        """
+        commit_ids = []
+        seen = set()
+        visited = set()
+        stack = [(self, False)]
+        while stack:
+            history, expanded = stack.pop()
+            if expanded:
+                if history.commit_id not in seen:
+                    seen.add(history.commit_id)
+                    commit_ids.append(history.commit_id)
+                continue
+            if id(history) in visited:
+                continue
+            visited.add(id(history))
+            stack.append((history, True))
+            stack += [(previous, False) for previous in reversed(history.previous)]
+        return commit_ids
+
+    def contains_id(self, commit_id: int):
+        """
+        Checks if the commit is part of the history, e.g. if a file version is an ancestor of this version.
+        Histories of commits with a generation less than or equal to the one of the commit are pruned and linear
+        segments are skipped with the jump pointers.
+        """
+        generation = GitCommitIds.get_generation(commit_id)
+        visited = set()
+        stack = [self]
+        while stack:
+            history = stack.pop()
+            while True:
+                if history.commit_id == commit_id:
+                    return True
+                if generation >= 0 and 0 <= history.generation <= generation:
+                    break
+                if len(history.previous) != 1:
+                    for previous in history.previous:
+                        if id(previous) not in visited:
+                            visited.add(id(previous))
+                            stack.append(previous)
+                    break
+                # all nodes between the node and its jump target have a larger generation than the jump target
+                if generation >= 0 and history.jump is not history and history.jump.generation >= generation:
+                    history = history.jump
+                else:
+                    history = history.previous[0]
+        return False
+
+    def __contains__(self, binsha: bytes):
+        commit_id = GitCommitIds.ids.get(binsha)
+        return commit_id is not None and self.contains_id(commit_id)
+
+    def __getitem__(self, idx: int):
+        if idx == 0:
+            return GitCommitIds.get_binsha(self.first)
+        if idx == -1:
+            return GitCommitIds.get_binsha(self.commit_id)
+        return GitCommitIds.get_binsha(self.commit_ids()[idx])
+
+    def __iter__(self):
+        for commit_id in self.commit_ids():
+            yield GitCommitIds.get_binsha(commit_id)
+
+    def __len__(self):
+        return len(self.commit_ids())
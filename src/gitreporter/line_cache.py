@@ -0,0 +1,91 @@
+import os
+import pickle
+from collections import OrderedDict
+
+from .config import Config
+from .textline import GitContentIds
+
+
+class GitLineCache:
+    """
+    LRU cache of parsed files, keyed by the blob id. For every line the categories, the normalized contents, the raw
+    text and the content id are stored, a file with the same content is only read and parsed once.
+    The size is the maximum number of cached lines. If a directory is given, the parsed files are stored on disk as
+    well, such that workers and later runs can reuse them.
+    """
+    VERSION = 1
+
+    def __init__(self, config: Config):
+        self.max_lines = config.options["line-cache-size"]
+        self.directory = config.options["line-cache-dir"]
+        self.standardize = config.options["comments-and-coding-standard"]
+        self.enabled = self.max_lines > 0 or self.directory is not None
+
+        self.entries: OrderedDict[str, list[tuple]] = OrderedDict()
+        self.lines = 0
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, blob: str):
+        return os.path.join(self.directory, f'{blob}-{int(self.standardize)}-{self.VERSION}.lines')
+
+    def get(self, blob: str):
+        """
+        returns the parsed lines of the blob or None
+        """
+        if not self.enabled:
+            return None
+
+        line_data = self.entries.get(blob)
+        if line_data is not None:
+            self.entries.move_to_end(blob)
+        elif self.directory is not None:
+            line_data = self.load(blob)
+            if line_data is not None:
+                self.insert(blob, line_data)
+
+        if line_data is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return line_data
+
+    def put(self, blob: str, line_data: list[tuple]):
+        if not self.enabled:
+            return
+        self.insert(blob, line_data)
+        if self.directory is not None:
+            self.store(blob, line_data)
+
+    def clear(self):
+        """
+        removes the parsed files from memory, their content ids are invalid after GitContentIds.reset
+        """
+        self.entries.clear()
+        self.lines = 0
+
+    def insert(self, blob: str, line_data: list[tuple]):
+        if not self.max_lines or len(line_data) > self.max_lines:
+            return
+        self.entries[blob] = line_data
+        self.lines += len(line_data)
+        while self.lines > self.max_lines:
+            _, evicted = self.entries.popitem(last=False)
+            self.lines -= len(evicted)
+
+    def load(self, blob: str):
+        try:
+            with open(self.path(blob), 'rb') as f:
+                line_data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        # content ids are only valid in the current process
+        return [(types, content, text, GitContentIds.get_id("".join(content))) for types, content, text in line_data]
+
+    def store(self, blob: str, line_data: list[tuple]):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(blob)
+        with open(f'{path}.{os.getpid()}.tmp', 'wb') as f:
+            pickle.dump([(types, content, text) for types, content, text, _ in line_data], f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f'{path}.{os.getpid()}.tmp', path)
@@ -0,0 +1,116 @@
+import os
+import pickle
+import tempfile
+
+from .commit import GitCommit
+from .config import Config
+from .scheduler import GitCommitScheduler
+from .snapshot import GitFileSnapshot
+
+
+class GitSnapshotStore:
+    """
+    On-disk store for file snapshots, which are still needed by children, but do not fit into the memory budget.
+    """
+    def __init__(self):
+        self.directory = tempfile.TemporaryDirectory(prefix='gitreporter-')
+
+    def close(self):
+        self.directory.cleanup()
+
+    def path(self, commit: GitCommit):
+        return os.path.join(self.directory.name, f'{commit.commit.hexsha}.snapshot')
+
+    def spill(self, commit: GitCommit):
+        with open(self.path(commit), 'wb') as f:
+            pickle.dump(commit.files, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def load(self, commit: GitCommit):
+        with open(self.path(commit), 'rb') as f:
+            files = pickle.load(f)
+        os.remove(self.path(commit))
+        return files
+
+
+class GitMemoryManager:
+    """
+    Releases the files of a commit as soon as all of its children are processed, only the statistics are kept.
+    Only the files of the start commit are needed after the analysis.
+    If a memory budget is given, snapshots which are still needed by pending children are spilled to disk while the
+    estimated memory usage is above the budget, they are loaded again as soon as one of their children is ready.
+    """
+    # rough estimation of the memory usage of a Textline including its history
+    BYTES_PER_LINE = 512
+
+    def __init__(self, config: Config, scheduler: GitCommitScheduler, start_commit: GitCommit):
+        self.start_commit = start_commit
+        self.budget_lines = config.options["memory-budget"] * 1024 * 1024 // self.BYTES_PER_LINE \
+            if config.options["memory-budget"] else None
+
+        # number of children which are not processed yet, only commits of the scheduler are considered
+        self.pending_children = {id(commit): len(scheduler.children.get(id(commit), []))
+                                 for commit in scheduler.commits}
+        # number of children which are ready but not processed yet, these parents must stay in memory
+        self.pinned = {}
+        # commits with files in memory, which are still needed
+        self.held: dict[int, GitCommit] = {}
+        self.held_lines = 0
+        self.spilled = set()
+        self.store = GitSnapshotStore() if self.budget_lines is not None else None
+
+        scheduler.add_ready_hook(self.commit_ready)
+        scheduler.add_finished_hook(self.commit_finished)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        if self.store:
+            self.store.close()
+
+    def commit_ready(self, commit: GitCommit):
+        for parent in commit.parents:
+            if id(parent) in self.spilled:
+                self.spilled.remove(id(parent))
+                parent.files = self.store.load(parent)
+                self.hold(parent)
+            self.pinned[id(parent)] = self.pinned.get(id(parent), 0) + 1
+
+    def commit_finished(self, commit: GitCommit):
+        for parent in commit.parents:
+            self.pinned[id(parent)] -= 1
+            if id(parent) not in self.pending_children:
+                continue
+            self.pending_children[id(parent)] -= 1
+            if not self.pending_children[id(parent)] and parent is not self.start_commit:
+                self.release(parent)
+
+        if self.pending_children[id(commit)]:
+            self.hold(commit)
+        self.enforce_budget()
+
+    def hold(self, commit: GitCommit):
+        self.held[id(commit)] = commit
+        self.held_lines += commit.files.line_count
+
+    def release(self, commit: GitCommit):
+        if id(commit) in self.held:
+            self.held.pop(id(commit))
+            self.held_lines -= commit.files.line_count
+        commit.files = GitFileSnapshot()
+
+    def enforce_budget(self):
+        if self.budget_lines is None or self.held_lines <= self.budget_lines:
+            return
+
+        candidates = sorted(
+            (commit for commit in self.held.values() if not self.pinned.get(id(commit))),
+            key=lambda commit: commit.files.line_count,
+            reverse=True
+        )
+        for commit in candidates:
+            if self.held_lines <= self.budget_lines:
+                break
+            self.store.spill(commit)
+            self.spilled.add(id(commit))
+            self.release(commit)
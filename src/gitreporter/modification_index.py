@@ -0,0 +1,62 @@
+import heapq
+from collections import Counter
+
+from .textline import Textline
+
+
+class GitModificationIndex:
+    """
+    Index of the inserted lines, which are candidates for modifications of deleted lines. The candidates are pruned with
+    upper bounds of SequenceMatcher.ratio: the length bound (real_quick_ratio) and the bound of the common characters
+    (quick_ratio). Candidates are returned in the order of the lines, therefore the first candidate which reaches the
+    similarity threshold is the same as in an exhaustive search.
+    """
+    def __init__(self, lines: list[Textline]):
+        self.lines = lines
+        self.strings = [line.to_string() for line in lines]
+        self.characters: list[Counter | None] = [None] * len(lines)
+        self.matched = set()
+
+        # lines by the length of their string
+        self.lengths: dict[int, list[int]] = {}
+        for idx, string in enumerate(self.strings):
+            self.lengths.setdefault(len(string), []).append(idx)
+
+    @staticmethod
+    def ratio(matches: int, length: int):
+        # same computation as in difflib, the bounds are compared exactly like the ratio itself
+        return 2.0 * matches / length if length else 1.0
+
+    def character_counts(self, idx: int):
+        if self.characters[idx] is None:
+            self.characters[idx] = Counter(self.strings[idx])
+        return self.characters[idx]
+
+    def candidates(self, string: str, threshold: float):
+        """
+        yields the indices of all unmatched lines, which might reach the threshold, in the order of the lines
+        """
+        length = len(string)
+        buckets = [bucket for other_length, bucket in self.lengths.items()
+                   if self.ratio(min(length, other_length), length + other_length) >= threshold]
+
+        characters = None
+        for idx in heapq.merge(*buckets):
+            if characters is None:
+                characters = Counter(string)
+            common = sum((characters & self.character_counts(idx)).values())
+            if self.ratio(common, length + len(self.strings[idx])) >= threshold:
+                yield idx
+
+    def remove(self, idx: int):
+        """
+        the generator of candidates must not be resumed after a line is removed
+        """
+        bucket = self.lengths[len(self.strings[idx])]
+        bucket.remove(idx)
+        if not bucket:
+            del self.lengths[len(self.strings[idx])]
+        self.matched.add(idx)
+
+    def remaining_lines(self):
+        return [line for idx, line in enumerate(self.lines) if idx not in self.matched]
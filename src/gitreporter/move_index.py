@@ -0,0 +1,78 @@
+from collections import deque
+
+from .textline import Textline
+
+
+class GitMovedCodeIndex:
+    """
+    Hash index of the unmatched deleted lines of all files of a commit, it detects code which was moved between files.
+    Every block of block_size consecutive deleted lines is indexed by the content ids of its lines. Inserted blocks are
+    looked up in the index and extended as long as the lines are equal, every deleted line is matched at most once.
+    A block is invalid as soon as one of its lines is matched, invalid blocks are removed from the front of the queue
+    of their key, therefore every block is skipped at most once.
+    """
+    def __init__(self, deletions: list[list[Textline]], block_size: int):
+        self.deletions = deletions
+        self.block_size = max(block_size, 1)
+        self.matched = [bytearray(len(lines)) for lines in deletions]
+        self.invalid = [bytearray(len(lines)) for lines in deletions]
+
+        self.blocks: dict[tuple, deque[tuple[int, int]]] = {}
+        for idx, lines in enumerate(deletions):
+            content_ids = [line.content_id for line in lines]
+            for position in range(len(lines) - self.block_size + 1):
+                self.blocks.setdefault(tuple(content_ids[position:position + self.block_size]), deque()) \
+                    .append((idx, position))
+
+    def find_block(self, content_ids: tuple):
+        """
+        returns the first indexed block with these lines, which is not matched yet, or None
+        """
+        candidates = self.blocks.get(content_ids)
+        while candidates:
+            idx, position = candidates[0]
+            if not self.invalid[idx][position]:
+                return idx, position
+            candidates.popleft()
+        return None
+
+    def mark_matched(self, idx: int, position: int, size: int):
+        """
+        marks the lines as matched and invalidates all blocks which contain one of them
+        """
+        self.matched[idx][position:position + size] = b'\1' * size
+        start = max(position - self.block_size + 1, 0)
+        self.invalid[idx][start:position + size] = b'\1' * (position + size - start)
+
+    def match(self, insertions: list[Textline]):
+        """
+        Transfers the history of moved lines to the inserted lines and marks them as matched.
+        Returns the positions of the matched inserted lines.
+        """
+        matched_insertions = set()
+        content_ids = [line.content_id for line in insertions]
+        i = 0
+        while i + self.block_size <= len(insertions):
+            block = self.find_block(tuple(content_ids[i:i + self.block_size]))
+            if block is None:
+                i += 1
+                continue
+
+            idx, position = block
+            lines = self.deletions[idx]
+            size = self.block_size
+            while i + size < len(insertions) and position + size < len(lines) \
+                    and not self.matched[idx][position + size] \
+                    and lines[position + size].content_id == content_ids[i + size]:
+                size += 1
+
+            self.mark_matched(idx, position, size)
+            for offset in range(size):
+                insertions[i + offset].history = lines[position + offset].history
+                matched_insertions.add(i + offset)
+            i += size
+
+        return matched_insertions
+
+    def remaining_deletions(self, idx: int):
+        return [line for position, line in enumerate(self.deletions[idx]) if not self.matched[idx][position]]
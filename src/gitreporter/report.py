@@ -1,27 +1,83 @@
-import os, chevron, json
+import os, chevron, json, hashlib, functools, multiprocessing, gzip, base64
+from chevron.tokenizer import tokenize
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 from importlib.resources import files
 
+from .attribution import GitLineAttribution
 from .commit import GitCommit
+from .commit_table import GitCommitTable
 from .config import Config
+from .export import GitNDJSONExporter
 from .repository_statistic import GitRepositoryStatistic
 from .types import GitRepositoryStatisticCategory as RepoCategory, GitLineCategory as LineCategory
 
 
+@functools.cache
+def read_template(template_name):
+    return files('gitreporter.templates').joinpath(f'{template_name}.mustache').read_text()
+
+
+@functools.cache
+def load_template(template_name):
+    """
+    returns the tokens of the template, it is read and tokenized once per process
+    """
+    return list(tokenize(read_template(template_name)))
+
+
+def render_page(template_name, path, dictionary, chunks=()):
+    """
+    the chunks of the line mapping are written next to the page as scripts, which pass the compressed json to the page
+    (scripts can be loaded from the file system, unlike json files)
+    """
+    with open(path, 'w', encoding='utf-8', errors='ignore') as g:
+        g.write(chevron.render(load_template(template_name), dictionary))
+
+    for idx, chunk in enumerate(chunks):
+        data = gzip.compress(json.dumps(chunk, separators=(',', ':')).encode('utf-8'), mtime=0)
+        with open(f'{path[:-len(".html")]}_lines_{idx}.js', 'w', encoding='utf-8') as g:
+            g.write(f'lineMappingChunk({idx}, "{base64.b64encode(data).decode("ascii")}");\n')
+
+
 class Report:
     TITLE = 'GitReporter'
+    # hashes of the data of the pages of the last report, pages with unchanged data are not rendered again
+    PAGE_HASHES = 'gitreport/.page-hashes.json'
+    # lines per chunk of a lazy line mapping
+    CHUNK_SIZE = 2000
+    LINE_MAPPING_INDEX = 'gitreport/files/line_mapping_index.js'
 
-    def __init__(self, config, statistics, commit_list):
+    def __init__(self, config, statistics, commit_list, commit_table):
         self.config: Config = config
         self.statistics: GitRepositoryStatistic = statistics
         self.commit_list: list[GitCommit] = commit_list
+        self.commit_table: GitCommitTable = commit_table
         self.idx_mapping = {}
+        self.page_hashes: dict[str, str] = {}
+        # author ids of the line mapping by commit id
+        self.author_ids: dict[int, str | None] = {}
+        # authors of the lazy line mappings, the chunks refer to them by their index
+        self.line_mapping_authors: dict[str, int] = {}
         self.table_template = []
 
     def create(self):
+        """
+        the json and ndjson exports replace the html report, both exports are written if both are enabled
+        """
+        ndjson = self.config.options['ndjson'] or self.config.options['ndjson-gzip']
+        if ndjson:
+            exporter = GitNDJSONExporter(self.config, self.statistics, self.commit_list, self.commit_table)
+            if self.config.options['ndjson-gzip']:
+                exporter.write('gitreport.ndjson.gz', compress=True)
+            else:
+                exporter.write('gitreport.ndjson')
+
         if self.config.options['json']:
             repository_report = self.json_repository_report()
             with open('gitreport.json', 'w', encoding='utf-8', errors='ignore') as f:
                 json.dump(repository_report, f, indent=4)
+
+        if ndjson or self.config.options['json']:
             return
 
         if "gitreport" not in os.listdir("."):
@@ -29,10 +85,23 @@ class Report:
         if "files" not in os.listdir("gitreport"):
             os.mkdir("gitreport/files")
 
+        self.load_page_hashes()
         self.entire_repository_report()
         self.file_reports()
+        self.store_page_hashes()
         return
 
+    def load_page_hashes(self):
+        try:
+            with open(self.PAGE_HASHES, 'r', encoding='utf-8') as f:
+                self.page_hashes = json.load(f)
+        except (OSError, ValueError):
+            self.page_hashes = {}
+
+    def store_page_hashes(self):
+        with open(self.PAGE_HASHES, 'w', encoding='utf-8') as f:
+            json.dump(self.page_hashes, f)
+
     def json_repository_report(self):
         dictionary = {
             'title': self.TITLE,
@@ -42,14 +111,14 @@ class Report:
 
         dictionary['authors'].append({
             'author-name': 'Total',
-            'statistics': self.statistics.totals
+            'statistics': self.statistics.totals.to_dict()
         })
 
         for author in sorted(self.statistics.authors):
             if author in self.statistics.authors:
                 dictionary['authors'].append({
                     'author-name': author,
-                    'statistics': self.statistics.authors[author]
+                    'statistics': self.statistics.authors[author].to_dict()
                 })
 
         return dictionary
@@ -68,33 +137,90 @@ class Report:
         return
 
     def file_reports(self):
-        for file in self.statistics.totals_per_file:
-            dictionary = {
-                'title': self.TITLE,
-                'subtitle': f'File: {file}',
-                'repository': self.config.options['repo'].split('/')[-1],
-                'is-file': True,
-                'visibility_settings': self.visibility_settings()
-                # TODO: line_mapping visibility settings
-            }
-            dictionary |= self.summary_table(
-                self.statistics.totals_per_file[file],
-                {author: self.statistics.authors_per_file[author][file]
-                    for author in self.statistics.authors_per_file
-                    if file in self.statistics.authors_per_file[author]}
-            )
-            if file in self.commit_list[0].files:
-                dictionary |= self.line_mapping(file)
-            else:
-                dictionary |= {
-                    'line-mapping': []
+        self.render_pages(self.file_report(file) for file in self.statistics.totals_per_file)
+        if self.config.options['lazy-line-mapping']:
+            with open(self.LINE_MAPPING_INDEX, 'w', encoding='utf-8') as f:
+                f.write(f'var lineMappingIndex = {json.dumps(self.line_mapping_index())};\n')
+
+    def file_report(self, file):
+        """
+        returns the page of a file as (html name, template name, dictionary, chunks of the line mapping)
+        """
+        dictionary = {
+            'title': self.TITLE,
+            'subtitle': f'File: {file}',
+            'repository': self.config.options['repo'].split('/')[-1],
+            'is-file': True,
+            'visibility_settings': self.visibility_settings()
+            # TODO: line_mapping visibility settings
+        }
+        dictionary |= self.summary_table(
+            self.statistics.totals_per_file[file],
+            {author: self.statistics.authors_per_file[author][file]
+                for author in self.statistics.authors_per_file
+                if file in self.statistics.authors_per_file[author]}
+        )
+        html_name = f"files/{file.replace('.', '_').replace('/', '_')}"
+        chunks = []
+        if self.config.options['lazy-line-mapping']:
+            chunks = self.line_mapping_chunks(file) if file in self.commit_list[0].files else []
+            dictionary |= {
+                'line-mapping': [],
+                'lazy-line-mapping': {
+                    'chunks': len(chunks),
+                    'chunk-size': self.CHUNK_SIZE,
+                    'prefix': f'{html_name.split("/")[-1]}_lines_'
                 }
-            self.generate_html(f"files/{file.replace('.', '_').replace('/', '_')}", "report_template", dictionary)
+            }
+        elif file in self.commit_list[0].files:
+            dictionary |= self.line_mapping(file)
+        else:
+            dictionary |= {
+                'line-mapping': []
+            }
+        return html_name, "report_template", dictionary, chunks
 
     def generate_html(self, html_name, template_name, dictionary):
-        template = files('gitreporter.templates').joinpath(f'{template_name}.mustache').read_text()
-        with open(f'gitreport/{html_name}.html', 'w', encoding='utf-8', errors='ignore') as g:
-            g.write(chevron.render(template, dictionary))
+        self.render_pages([(html_name, template_name, dictionary, [])])
+
+    def changed_pages(self, pages):
+        """
+        yields the pages (template name, path, dictionary, chunks), whose data or template changed since the last
+        report
+        """
+        for html_name, template_name, dictionary, chunks in pages:
+            path = f'gitreport/{html_name}.html'
+            page_hash = hashlib.sha256(read_template(template_name).encode('utf-8'))
+            page_hash.update(json.dumps(dictionary).encode('utf-8'))
+            page_hash.update(json.dumps(chunks).encode('utf-8'))
+            if self.page_hashes.get(html_name) == page_hash.hexdigest() and os.path.exists(path):
+                continue
+            self.page_hashes[html_name] = page_hash.hexdigest()
+            yield template_name, path, dictionary, chunks
+
+    def render_pages(self, pages):
+        """
+        renders the pages (html name, template name, dictionary, chunks), with a process pool if there are several
+        workers, at most a few pages per worker are pending, such that the dictionaries are created while the pages are
+        rendered
+        """
+        workers = self.config.options['workers']
+        if workers <= 1:
+            for page in self.changed_pages(pages):
+                render_page(*page)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            pending = set()
+            for page in self.changed_pages(pages):
+                if len(pending) >= 4 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                pending.add(executor.submit(render_page, *page))
+
+            for future in pending:
+                future.result()
 
     def data_with_ref(self, data, reference):
         if reference is None:
@@ -217,17 +343,14 @@ class Report:
 
         return result
 
-    def find_author(self, binsha):
-        commit = next(
-            filter(
-                lambda commit:
-                    commit.commit.binsha == binsha and \
-                    self.config.in_time_interval(commit.commit.committed_datetime),
-                self.commit_list
-            ),
-            None
-        )
-        return commit.commit.author.email if commit else None
+    def find_author(self, commit_id):
+        return self.commit_table.author_in_time_interval(commit_id)
+
+    def author_id(self, commit_id):
+        if commit_id not in self.author_ids:
+            author = self.find_author(commit_id)
+            self.author_ids[commit_id] = author.lower().replace(" ", "_") if author else None
+        return self.author_ids[commit_id]
 
     def line_mapping(self, file):
         dictionary = {
@@ -235,17 +358,40 @@ class Report:
         }
 
         lines = self.commit_list[0].files[file].lines
-        for idx, line in enumerate(lines, start=1):
-            author = self.find_author(line.history[0])
+        attribution = self.statistics.attributions[file]
+        for idx, (line, commit_id, category) in enumerate(zip(lines, attribution.commits, attribution.categories),
+                                                          start=1):
             dictionary['line-mapping'].append({
                 'number': idx,
-                'type': line.get_type().value.lower().replace(" ", "_"),
+                'type': GitLineAttribution.CATEGORY_IDS[category],
                 'content': line.text[:120],
-                'author': author.lower().replace(" ", "_") if author else None
+                'author': self.author_id(commit_id)
             })
 
         return dictionary
 
+    def line_mapping_chunks(self, file):
+        """
+        returns the line mapping as chunks of rows [author index, category index, content], the indices refer to the
+        shared line mapping index (-1 is no author)
+        """
+        rows = []
+        lines = self.commit_list[0].files[file].lines
+        attribution = self.statistics.attributions[file]
+        for line, commit_id, category in zip(lines, attribution.commits, attribution.categories):
+            author = self.author_id(commit_id)
+            if author is not None and author not in self.line_mapping_authors:
+                self.line_mapping_authors[author] = len(self.line_mapping_authors)
+            rows.append([self.line_mapping_authors[author] if author is not None else -1, category, line.text[:120]])
+
+        return [rows[idx:idx + self.CHUNK_SIZE] for idx in range(0, len(rows), self.CHUNK_SIZE)]
+
+    def line_mapping_index(self):
+        return {
+            'authors': list(self.line_mapping_authors),
+            'categories': GitLineAttribution.CATEGORY_IDS
+        }
+
     def file_table(self):
         return {
             'files': sorted([{
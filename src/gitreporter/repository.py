@@ -1,19 +1,44 @@
-from git import Repo
+from typing import Union
+
+from git import Commit
+from .blob_reader import GitBlobReader
+from .cache import GitAnalysisCache
+from .change_stream import GitChangeStream
 from .commit import GitCommit, GitCommitStatus
+from .commit_graph import GitCommitGraph
+from .commit_table import GitCommitTable
 from .config import Config
 from .diff import GitDiff
+from .git_command import GitCountingRepo
+from .history import GitCommitIds
+from .diff_cache import GitDiffCache
+from .line_cache import GitLineCache
+from .memory import GitMemoryManager
 from .report import Report
+from .scheduler import GitCommitScheduler
+from .sharding import GitShardEngine
 from .repository_statistic import GitRepositoryStatistic
+from .textline import GitContentIds
 from .progressbar import ProgressBar
 
 
 class GitRepository:
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, changes: Union[dict, None] = None):
+        """
+        If changes are given, the repository is analyzed by a worker of the GitShardEngine and only these changes are
+        considered.
+        """
         self.repo_path = config.options["repo"]
-        self.repo: Repo = Repo(self.repo_path)
+        self.repo: GitCountingRepo = GitCountingRepo(self.repo_path)
         self.branch = config.options["branch"]
-        self.repo.git.checkout(self.branch)
+        self.worker = changes is not None
+        self.changes = changes
+        if not self.worker:
+            self.repo.git.checkout(self.branch)
         self.commit_list = self.create_commit_list()
+        self.blob_reader = GitBlobReader(self.repo)
+        self.line_cache = GitLineCache(config)
+        self.diff_cache = GitDiffCache(config)
         self.statistics = GitRepositoryStatistic(config)
         self.config = config
 
@@ -31,92 +56,95 @@ class GitRepository:
     def create_commit_list(self):
         """
         Creates a list of all commits and calculates how many children every single commit has.
+        The relations are taken from the commit graph, which is built in linear time.
         """
-        commits = [GitCommit(commit) for commit in self.repo.iter_commits(self.branch)]
+        self.graph = GitCommitGraph(self.repo, self.branch)
+        commits = [GitCommit(Commit(self.repo, binsha)) for binsha in self.graph.binshas]
 
-        for git_commit_child in commits:
-            for parent in git_commit_child.commit.parents:
-                found_parent = False
-
-                for git_commit_parent in commits:
-                    if parent.binsha == git_commit_parent.commit.binsha:
-                        git_commit_parent.add_child()
-                        git_commit_child.add_parent(git_commit_parent)
-                        found_parent = True
-
-                assert found_parent, "Could not find a parent, although it must exist"
+        for idx, git_commit in enumerate(commits):
+            GitCommitIds.register(git_commit.commit.binsha, self.graph.generation(idx))
+            git_commit.index = idx
+            git_commit.parents = [commits[parent] for parent in self.graph.parents(idx)]
+            git_commit.children = self.graph.child_count(idx)
+            git_commit.remaining_children = git_commit.children
 
         return commits
 
-    def split_git_output(self, files_raw):
-        if len(files_raw) == 1 and not len(files_raw[0]):
-            return []
-        files = []
-        for f in files_raw:
-            split_f = f.split('\t')
-            files.append(split_f)
-        return files
+    def read_changes(self, exclude: Union[GitCommit, None] = None):
+        """
+        Reads the changes of all commits with a single git call, the key is (commit binsha, parent binsha).
+        Changes of the excluded commit and its ancestors are not read.
+        """
+        self.changes = {}
+        stream = GitChangeStream(self.repo, self.branch, self.graph, exclude.commit.binsha if exclude else None)
+        for binsha, parent_binsha, changes in stream:
+            self.changes[(binsha, parent_binsha)] = self.trim_by_whitelist(changes)
 
-    def update_commit(self, commit: GitCommit, progress_bar: ProgressBar):
+    def pop_changes(self, commit: GitCommit, parent: GitCommit = None):
+        """
+        changes are only needed once, therefore they are removed from the mapping
+        """
+        return self.changes.pop((commit.commit.binsha, parent.commit.binsha if parent else None), [])
+
+    def update_commit(self, commit: GitCommit):
         """
         For a given commit, this function creates a mapping from each line of every file to the corresponding commit.
         This is done with a dynamic programming approach, such that every parent commit has to be considered only once.
+        All parents have to be processed already, the order is given by the GitCommitScheduler.
         """
-        commit.remaining_children -= 1
-        if commit.status == GitCommitStatus.VISITED:
-            return
         commit.status = GitCommitStatus.VISITED
+        for parent in commit.parents:
+            parent.remaining_children -= 1
 
         if not commit.parents:
-            files = self.split_git_output(self.repo.git.show(commit.commit, '--pretty=', '--name-status').split('\n'))
-            files = self.trim_by_whitelist(files)
+            files = self.pop_changes(commit)
             for file in files:
-                assert file[0] == 'A', "newly created file is treated not as added..."
-                commit.add_file(file[1], self.repo.git.show(f'{commit.commit}:{file[1]}'), self.config,
-                                add_too=True)
+                assert file.status == 'A', "newly created file is treated not as added..."
+            commit.add_files({file.path: file.new_blob for file in files}, self.blob_reader, self.line_cache,
+                             self.config, add_too=True)
 
             diff = GitDiff(None, commit, self.config)
             diff.create_diff()
-            progress_bar.increment()
             return
 
-        for parent in commit.parents:
-            self.update_commit(parent, progress_bar)
-
         if len(commit.parents) == 1:
-            files = self.split_git_output(self.repo.git.diff(commit.parents[0].commit, commit.commit,
-                                                             "--name-status", "--no-renames").split('\n'))
-            files = self.trim_by_whitelist(files)
+            files = self.pop_changes(commit)
             commit.update_files(commit.parents[0], files)
-            for file in files:
-                if file[0] == 'A' or file[0] == 'M':
-                    commit.add_file(file[1], self.repo.git.show(f'{commit.commit}:{file[1]}'), self.config)
+            commit.add_files({file.path: file.new_blob for file in files if file.status == 'A' or file.status == 'M'},
+                             self.blob_reader, self.line_cache, self.config)
 
-            diff = GitDiff(commit.parents[0], commit, self.config)
+            diff = GitDiff(commit.parents[0], commit, self.config, diff_cache=self.diff_cache)
             diff.create_diff()
-            progress_bar.increment()
             return
 
         assert len(commit.parents) == 2, "we dont want to merge three commits..."
-        files_parent_1 = self.split_git_output(self.repo.git.diff(commit.parents[0].commit, commit.commit,
-                                                                  "--name-status", "--no-renames").split('\n'))
-        files_parent_1 = self.trim_by_whitelist(files_parent_1)
-        files_parent_2 = self.split_git_output(self.repo.git.diff(commit.parents[1].commit, commit.commit,
-                                                                  "--name-status", "--no-renames").split('\n'))
-        files_parent_2 = self.trim_by_whitelist(files_parent_2)
+        files_parent_1 = self.pop_changes(commit, commit.parents[0])
+        files_parent_2 = self.pop_changes(commit, commit.parents[1])
 
         files_to_update = commit.update_files_merge(commit.parents[0], files_parent_1, commit.parents[1],
                                                     files_parent_2)
 
-        for file in files_to_update:
-            commit.add_file(file, self.repo.git.show(f'{commit.commit}:{file}'), self.config)
+        new_blobs = {file.path: file.new_blob for file in files_parent_1 + files_parent_2}
+        commit.add_files({file: new_blobs[file] for file in files_to_update}, self.blob_reader, self.line_cache,
+                         self.config)
 
-        diff = GitDiff(commit.parents[0], commit, self.config, commit.parents[1], )
+        diff = GitDiff(commit.parents[0], commit, self.config, commit.parents[1], self.diff_cache)
         diff.create_diff()
-        progress_bar.increment()
         return
 
+    def process_commits(self, scheduler: GitCommitScheduler, start_commit: GitCommit):
+        if not self.config.options["memory-bounded"] and not self.config.options["memory-budget"]:
+            with self.blob_reader:
+                scheduler.run(self.update_commit)
+            return
+
+        with GitMemoryManager(self.config, scheduler, start_commit), self.blob_reader:
+            scheduler.run(self.update_commit)
+
     def analyze(self):
+        GitContentIds.reset()
+        self.line_cache.clear()
+
         if self.config.options["hard-end-date"]:
             self.commit_list = [commit for commit in self.commit_list if commit.commit.committed_datetime <=
                                 self.config.options["hard-end-date"]]
@@ -124,12 +152,47 @@ class GitRepository:
         assert self.commit_list, "no commits could be found in this repository before hard end date..."
         start_commit = self.commit_list[0]
 
-        with ProgressBar('Processing Commits', len(self.commit_list)) as progress_bar:
-            self.update_commit(start_commit, progress_bar)
+        if self.worker:
+            self.process_commits(GitCommitScheduler(start_commit), start_commit)
+            return
+
+        cache = GitAnalysisCache(self.config, self.repo) if self.config.options["cache"] else None
+        cached_start_commit = cache.restore(self.commit_list, start_commit) if cache else None
+        self.read_changes(cached_start_commit)
+        spawned_processes = self.repo.git.spawned_processes
+        if cached_start_commit:
+            scheduler = GitCommitScheduler(start_commit)
+            print(f'Resuming from cached analysis of {cached_start_commit.commit.hexsha}')
+            with ProgressBar('Processing Commits', len(scheduler)) as progress_bar:
+                scheduler.add_finished_hook(lambda commit: progress_bar.increment())
+                self.process_commits(scheduler, start_commit)
+            spawned_processes = self.repo.git.spawned_processes
+        elif self.config.options["workers"] > 1 and not self.config.options["detect-moved-code"]:
+            # moved code is detected across all files of a commit, therefore the files cannot be sharded
+            engine = GitShardEngine(self.config, self.config.options["workers"])
+            spawned_processes += engine.run(start_commit, self.changes)
+            for content_cache, (hits, misses) in zip((self.line_cache, self.diff_cache), engine.cache_statistics):
+                content_cache.hits += hits
+                content_cache.misses += misses
+        else:
+            scheduler = GitCommitScheduler(start_commit)
+            with ProgressBar('Processing Commits', len(self.commit_list)) as progress_bar:
+                scheduler.add_finished_hook(lambda commit: progress_bar.increment())
+                self.process_commits(scheduler, start_commit)
+            spawned_processes = self.repo.git.spawned_processes
+        print(f'Spawned git processes: {spawned_processes}')
+        if self.line_cache.enabled:
+            print(f'Line cache: {self.line_cache.hits} hits, {self.line_cache.misses} misses')
+        if self.diff_cache.enabled:
+            print(f'Diff cache: {self.diff_cache.hits} hits, {self.diff_cache.misses} misses')
+
+        if cache:
+            cache.store(self.commit_list, start_commit)
 
     def create_report(self):
+        commit_table = GitCommitTable(self.config, self.commit_list)
         self.statistics.add_commits(self.commit_list)
-        self.statistics.survived_lines(self.commit_list)
+        self.statistics.survived_lines(self.commit_list, commit_table)
 
-        report = Report(self.config, self.statistics, self.commit_list)
+        report = Report(self.config, self.statistics, self.commit_list, commit_table)
         report.create()
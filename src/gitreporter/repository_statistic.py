@@ -1,9 +1,11 @@
-import copy, json
+import json
 
-from .statistic_values import GitRepositoryStatisticValues, GitCommitStatisticValues, empty_value
-from .types import GitRepositoryStatisticCategory as RepoCategory, GitLineCategory as LineCategory
+from .attribution import GitLineAttribution
+from .statistic_values import GitRepositoryStatisticValues
+from .statistic_table import GitStatisticTable
 
 from .commit import GitCommit, GitCommitStatus
+from .commit_table import GitCommitTable
 
 
 class GitRepositoryStatistic:
@@ -11,77 +13,54 @@ class GitRepositoryStatistic:
         self.authors_per_file: dict[str, dict[str, GitRepositoryStatisticValues]] = {}
         self.authors: dict[str, GitRepositoryStatisticValues] = {}
         self.totals_per_file: dict[str, GitRepositoryStatisticValues] = {}
-        self.totals: GitRepositoryStatisticValues = \
-            GitRepositoryStatisticValues(
-                GitCommitStatisticValues(empty_value(), empty_value(), empty_value()),
-                False,
-                True)
+        self.totals: GitRepositoryStatisticValues = GitRepositoryStatisticValues.empty()
+        self.attributions: dict[str, GitLineAttribution] = {}
         self.config = config
 
-    def compute_totals_per_file(self):
-        self.totals_per_file: dict[str, GitRepositoryStatisticValues] = {}
-        for email, file in self.authors_per_file.items():
-            for filename, values in file.items():
-                if filename in self.totals_per_file:
-                    self.totals_per_file[filename] += values
-                else:
-                    self.totals_per_file[filename] = copy.deepcopy(values)
-
-    def add_commit(self, email, commit_statistic, merge):
-        cumulative_value = GitCommitStatisticValues(empty_value(), empty_value(), empty_value())
-
-        if email not in self.authors_per_file:
-            self.authors_per_file[email] = {}
-            for filename, values in commit_statistic.file_mapping.items():  # type: str, GitCommitStatisticValues
-                cumulative_value += values
-                self.authors_per_file[email][filename] = GitRepositoryStatisticValues(values, merge)
-        else:
-            for filename, values in commit_statistic.file_mapping.items():  # type: str, GitCommitStatisticValues
-                cumulative_value += values
-                if filename in self.authors_per_file[email]:
-                    self.authors_per_file[email][filename].add(values, merge)
-                else:
-                    self.authors_per_file[email][filename] = GitRepositoryStatisticValues(values, merge)
-
-        if email not in self.authors:
-            self.authors[email] = GitRepositoryStatisticValues(cumulative_value, merge)
-        else:
-            self.authors[email].add(cumulative_value, merge)
-        self.totals.add(cumulative_value, merge)
+    @staticmethod
+    def empty_values():
+        return GitRepositoryStatisticValues.empty()
 
     def add_commits(self, commit_list):
+        table = GitStatisticTable()
         for commit in commit_list:
             if self.config.check_commit_admissible(commit) and commit.status == GitCommitStatus.VISITED:
-                self.add_commit(commit.commit.author.email, commit.statistics, merge=len(commit.parents) > 1)
-        self.compute_totals_per_file()
+                table.add_commit(commit.commit.author.email, commit.statistics, merge=len(commit.parents) > 1)
 
-    def find_author(self, binsha, commit_list):
-        for commit in commit_list:
-            if commit.commit.binsha == binsha:
-                if self.config.check_commit_admissible(commit):
-                    return commit.commit.author.email
-                return None
-        return None
+        self.authors_per_file, self.authors, self.totals_per_file, totals = table.aggregate()
+        self.totals += totals
 
-    def survived_lines(self, commit_list):
+    def attribute_lines(self, commit_list, attribute=map):
+        """
+        computes the attribution of the lines of all files of the tip commit, which are part of the statistic
+        the files are independent of each other, attribute is the map function which is used for them
+        """
         last_commit: GitCommit = commit_list[0]
-        for filename, total in self.totals_per_file.items():
-            if filename not in last_commit.files:
-                continue
+        filenames = [filename for filename in self.totals_per_file if filename in last_commit.files]
+        files = [last_commit.files[filename].lines for filename in filenames]
+        self.attributions = dict(zip(filenames, attribute(GitLineAttribution, files)))
 
-            file = last_commit.files[filename].lines
-            for line in file:
-                binsha = line.history[0]
-                email = self.find_author(binsha, commit_list)
+    def survived_lines(self, commit_list, commit_table: GitCommitTable):
+        self.attribute_lines(commit_list)
+        for filename, attribution in self.attributions.items():
+            total = self.totals_per_file[filename]
+            for (commit_id, category), count in attribution.counts().items():
+                email = commit_table.admissible_author(commit_id)
 
                 if email is None:
                     continue
 
-                self.totals[RepoCategory.SURVIVED_LINES][line.get_type()] += 1
-                total[RepoCategory.SURVIVED_LINES][line.get_type()] += 1
+                self.totals.add_survived_lines(category, count)
+                total.add_survived_lines(category, count)
+
+                if filename not in self.authors_per_file.setdefault(email, {}):
+                    # moved code can survive in files which were never changed by its author
+                    self.authors_per_file[email][filename] = self.empty_values()
+                if email not in self.authors:
+                    self.authors[email] = self.empty_values()
 
-                self.authors[email][RepoCategory.SURVIVED_LINES][line.get_type()] += 1
-                self.authors_per_file[email][filename][RepoCategory.SURVIVED_LINES][line.get_type()] += 1
+                self.authors[email].add_survived_lines(category, count)
+                self.authors_per_file[email][filename].add_survived_lines(category, count)
 
     """
     def create_json(self, write_to_file=False):
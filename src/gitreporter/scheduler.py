@@ -0,0 +1,85 @@
+from collections import deque
+from typing import Callable
+
+from .commit import GitCommit, GitCommitStatus
+
+
+class GitCommitScheduler:
+    """
+    Walks all ancestors of a start commit in topological order (parents before children) with an explicit work queue.
+    A merge commit becomes ready as soon as all of its parents have been finished.
+    """
+    def __init__(self, start_commit: GitCommit):
+        self.start_commit = start_commit
+        self.commits: list[GitCommit] = []
+        self.children: dict[int, list[GitCommit]] = {}
+        self.missing_parents: dict[int, int] = {}
+
+        self.ready_hooks: list[Callable[[GitCommit], None]] = []
+        self.finished_hooks: list[Callable[[GitCommit], None]] = []
+
+        self.collect_ancestors()
+
+    def __len__(self):
+        return len(self.commits)
+
+    def add_ready_hook(self, hook: Callable[[GitCommit], None]):
+        """
+        hook is called with a commit as soon as all of its parents are finished
+        """
+        self.ready_hooks.append(hook)
+
+    def add_finished_hook(self, hook: Callable[[GitCommit], None]):
+        """
+        hook is called with a commit after it has been processed
+        """
+        self.finished_hooks.append(hook)
+
+    def collect_ancestors(self):
+        """
+        commits which are already visited (e.g. restored from the cache) are treated as finished
+        """
+        if self.start_commit.status == GitCommitStatus.VISITED:
+            return
+        stack = [self.start_commit]
+        self.missing_parents[id(self.start_commit)] = self.unfinished_parents(self.start_commit)
+        while stack:
+            commit = stack.pop()
+            self.commits.append(commit)
+            for parent in commit.parents:
+                if parent.status == GitCommitStatus.VISITED:
+                    continue
+                self.children.setdefault(id(parent), []).append(commit)
+                if id(parent) not in self.missing_parents:
+                    self.missing_parents[id(parent)] = self.unfinished_parents(parent)
+                    stack.append(parent)
+
+    def unfinished_parents(self, commit: GitCommit):
+        return len([parent for parent in commit.parents if parent.status != GitCommitStatus.VISITED])
+
+    def roots(self):
+        return [commit for commit in self.commits if not self.missing_parents[id(commit)]]
+
+    def run(self, process: Callable[[GitCommit], None]):
+        """
+        calls process for every commit, every parent is processed before its children
+        """
+        queue = deque()
+        for commit in self.roots():
+            self.commit_ready(commit, queue)
+
+        while queue:
+            commit = queue.popleft()
+            process(commit)
+            for hook in self.finished_hooks:
+                hook(commit)
+
+            for child in self.children.get(id(commit), []):
+                self.missing_parents[id(child)] -= 1
+                if not self.missing_parents[id(child)]:
+                    self.commit_ready(child, queue)
+
+    def commit_ready(self, commit: GitCommit, queue: deque):
+        for hook in self.ready_hooks:
+            hook(commit)
+        queue.append(commit)
@@ -0,0 +1,114 @@
+import heapq
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .commit import GitCommit, GitCommitStatus
+from .commit_statistic import GitCommitStatistic
+from .config import Config
+from .progressbar import ProgressBar
+from .scheduler import GitCommitScheduler
+
+
+def changed_file_groups(commit: GitCommit):
+    """
+    the groups are in the same order as they are evaluated in GitDiff.compute_diff
+    """
+    return [commit.added_files, commit.deleted_files, commit.modified_files, commit.deleted_files_p2,
+            commit.modified_files_p2, commit.merge_files]
+
+
+def analyze_shard(options: dict, changes: dict):
+    """
+    Entry point of a worker process: replays the whole commit DAG, but only for the files contained in changes.
+    Returns the statistics per commit as (group, filename, values), the files of the start commit, how many git
+    processes were spawned and the hits and misses of the line cache and the diff cache.
+    """
+    from .repository import GitRepository
+
+    repository = GitRepository(Config(options), changes)
+    repository.analyze()
+
+    statistics = {}
+    for commit in repository.commit_list:
+        if commit.status != GitCommitStatus.VISITED or not commit.statistics.file_mapping:
+            continue
+        statistics[commit.commit.binsha] = [
+            (group, filename, commit.statistics.file_mapping[filename])
+            for group, filenames in enumerate(changed_file_groups(commit))
+            for filename in filenames
+        ]
+
+    return statistics, repository.commit_list[0].files, repository.repo.git.spawned_processes, \
+        [(cache.hits, cache.misses) for cache in (repository.line_cache, repository.diff_cache)]
+
+
+class GitShardEngine:
+    """
+    Distributes the file paths of a repository over a process pool. Files are analyzed independently of each other,
+    therefore every worker can replay the commit DAG for its own subset of paths.
+    The results are merged in the same order as the single process analysis would create them.
+    """
+    def __init__(self, config: Config, workers: int):
+        self.config = config
+        self.workers = workers
+        # hits and misses of the line cache and the diff cache
+        self.cache_statistics = [[0, 0], [0, 0]]
+
+    def partition(self, changes: dict):
+        """
+        assigns the paths greedily to the shard with the least changes, paths with many changes first
+        """
+        change_counts = {}
+        for files in changes.values():
+            for file in files:
+                change_counts[file.path] = change_counts.get(file.path, 0) + 1
+
+        number_of_shards = min(self.workers, len(change_counts))
+        heap = [(0, idx) for idx in range(number_of_shards)]
+        shard_of_path = {}
+        for path in sorted(change_counts, key=lambda p: (-change_counts[p], p)):
+            load, idx = heapq.heappop(heap)
+            shard_of_path[path] = idx
+            heapq.heappush(heap, (load + change_counts[path], idx))
+
+        shards = [{} for _ in range(number_of_shards)]
+        for key, files in changes.items():
+            for file in files:
+                shards[shard_of_path[file.path]].setdefault(key, []).append(file)
+        return shards
+
+    def run(self, start_commit: GitCommit, changes: dict):
+        """
+        analyzes all ancestors of the start commit, returns the number of git processes spawned by the workers
+        """
+        shards = self.partition(changes)
+        results = [None] * len(shards)
+
+        options = self.config.get_options_with_datetime_string()
+        with ProgressBar('Processing Shards', len(shards)) as progress_bar, \
+                ProcessPoolExecutor(max_workers=len(shards) or 1,
+                                    mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = {executor.submit(analyze_shard, options, shard): idx for idx, shard in enumerate(shards)}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                progress_bar.increment()
+
+        commits = GitCommitScheduler(start_commit).commits
+        for commit in commits:
+            commit.status = GitCommitStatus.VISITED
+            commit.statistics = GitCommitStatistic()
+
+        for commit in commits:
+            entries = []
+            for statistics, _, _, _ in results:
+                entries += statistics.get(commit.commit.binsha, [])
+            for _, filename, values in sorted(entries, key=lambda entry: entry[:2]):
+                commit.statistics.file_mapping[filename] = values
+
+        for _, files, _, cache_statistics in results:
+            start_commit.files.update(files)
+            for totals, (hits, misses) in zip(self.cache_statistics, cache_statistics):
+                totals[0] += hits
+                totals[1] += misses
+
+        return sum(spawned_processes for _, _, spawned_processes, _ in results)
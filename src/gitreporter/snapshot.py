@@ -0,0 +1,77 @@
+import math
+from collections.abc import MutableMapping
+
+
+class GitFileSnapshot(MutableMapping):
+    """
+    Mapping filename -> GitFile of a commit with structural sharing.
+    The files are distributed over hash buckets. A copy only duplicates the list of buckets, a bucket itself is copied
+    when it is modified for the first time (copy-on-write). GitFile objects are never modified after their commit is
+    processed, therefore unchanged files and their lines are shared between a parent and its children.
+    """
+    def __init__(self, files=None):
+        number_of_buckets = 1 << math.ceil(math.log2(math.isqrt(len(files)) + 1)) if files else 1
+        self.buckets: list[dict] = [{} for _ in range(number_of_buckets)]
+        self.owned: list[bool] = [True] * number_of_buckets
+        self.length = 0
+        self.line_count = 0
+        if files:
+            self.update(files)
+
+    def __reduce__(self):
+        # the bucket of a filename depends on the (randomized) string hash of the current process
+        return GitFileSnapshot, (dict(self),)
+
+    def bucket_index(self, filename: str):
+        return hash(filename) & (len(self.buckets) - 1)
+
+    def writable_bucket(self, filename: str):
+        idx = self.bucket_index(filename)
+        if not self.owned[idx]:
+            self.buckets[idx] = self.buckets[idx].copy()
+            self.owned[idx] = True
+        return self.buckets[idx]
+
+    def __getitem__(self, filename: str):
+        return self.buckets[self.bucket_index(filename)][filename]
+
+    def __setitem__(self, filename: str, file):
+        bucket = self.writable_bucket(filename)
+        if filename in bucket:
+            self.line_count -= len(bucket[filename].lines)
+        else:
+            self.length += 1
+        self.line_count += len(file.lines)
+        bucket[filename] = file
+
+    def __delitem__(self, filename: str):
+        bucket = self.writable_bucket(filename)
+        self.line_count -= len(bucket[filename].lines)
+        del bucket[filename]
+        self.length -= 1
+
+    def __contains__(self, filename):
+        return filename in self.buckets[self.bucket_index(filename)]
+
+    def __iter__(self):
+        for bucket in self.buckets:
+            yield from bucket
+
+    def __len__(self):
+        return self.length
+
+    def copy(self):
+        """
+        The buckets are shared until one of the snapshots modifies them.
+        If the buckets got too large, the files are redistributed to more buckets.
+        """
+        if self.length > 4 * len(self.buckets) ** 2:
+            return GitFileSnapshot(self)
+
+        snapshot = GitFileSnapshot()
+        snapshot.buckets = self.buckets.copy()
+        snapshot.owned = [False] * len(self.buckets)
+        snapshot.length = self.length
+        snapshot.line_count = self.line_count
+        self.owned = [False] * len(self.buckets)
+        return snapshot
@@ -0,0 +1,162 @@
+from array import array
+from collections import Counter
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .commit_statistic import GitCommitStatistic
+from .statistic_values import GitCommitStatisticValues, GitRepositoryStatisticValues, add_values
+from .types import GitRepositoryStatisticCategory as RepoCategory
+
+
+class GitStatisticTable:
+    """
+    Columnar table of the statistics of all admissible commits. Every changed file of a commit is a row (author id,
+    file id, merge flag and the values of the commit categories, followed by a 1 which counts the commits), additionally
+    every commit is a row (author id, merge flag), because commits without changed files are counted as well.
+    The rows are grouped once by author, file and merge flag, the statistics of the files, the authors and the totals
+    are sums of these groups. Grouping uses numpy if it is available. Groups are returned in the order of their first
+    row, like the former incremental aggregation.
+    """
+    SIZE = GitCommitStatisticValues.SIZE
+    WIDTH = SIZE + 1
+
+    def __init__(self):
+        self.emails: list[str] = []
+        self.email_ids: dict[str, int] = {}
+        self.filenames: list[str] = []
+        self.file_ids: dict[str, int] = {}
+
+        self.authors = array('q')
+        self.files = array('q')
+        self.merges = array('q')
+        self.values = array('q')
+
+        self.commit_authors = array('q')
+        self.commit_merges = array('q')
+
+    def add_commit(self, email: str, commit_statistic: GitCommitStatistic, merge: bool):
+        author = self.email_ids.setdefault(email, len(self.email_ids))
+        if author == len(self.emails):
+            self.emails.append(email)
+        self.commit_authors.append(author)
+        self.commit_merges.append(merge)
+
+        for filename, values in commit_statistic.file_mapping.items():  # type: str, GitCommitStatisticValues
+            file = self.file_ids.setdefault(filename, len(self.file_ids))
+            if file == len(self.filenames):
+                self.filenames.append(filename)
+            self.authors.append(author)
+            self.files.append(file)
+            self.merges.append(merge)
+            self.values.extend(values.values)
+            self.values.append(1)
+
+    @classmethod
+    def group_sums(cls, keys: array, values: array):
+        """
+        returns {key: sum of the values} in the order of the first row of every key
+        """
+        if not keys:
+            return {}
+
+        if numpy is None:
+            groups = {}
+            for row, key in enumerate(keys):
+                sums = groups.get(key)
+                if sums is None:
+                    groups[key] = values[row * cls.WIDTH:(row + 1) * cls.WIDTH]
+                else:
+                    add_values(sums, 0, values[row * cls.WIDTH:(row + 1) * cls.WIDTH])
+            return groups
+
+        keys = numpy.frombuffer(keys, dtype=numpy.int64)
+        values = numpy.frombuffer(values, dtype=numpy.int64).reshape(len(keys), cls.WIDTH)
+        # a stable sort keeps the first row of every key at the start of its group
+        order = numpy.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        starts = numpy.flatnonzero(numpy.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1])))
+        sums = numpy.add.reduceat(values[order], starts, axis=0)
+
+        return {int(sorted_keys[starts[idx]]): array('q', sums[idx].tobytes())
+                for idx in numpy.argsort(order[starts]).tolist()}
+
+    @staticmethod
+    def group_counts(keys: array):
+        if numpy is None:
+            return Counter(keys)
+        counts = numpy.bincount(numpy.frombuffer(keys, dtype=numpy.int64))
+        return {key: int(counts[key]) for key in numpy.flatnonzero(counts).tolist()}
+
+    @staticmethod
+    def combine(*columns: tuple[array, int]):
+        """
+        combines columns (with the number of their distinct values) to a single key column
+        """
+        if numpy is None:
+            keys = array('q', bytes(8 * len(columns[0][0])))
+            for column, size in columns:
+                keys = array('q', (key * size + value for key, value in zip(keys, column)))
+            return keys
+
+        keys = numpy.zeros(len(columns[0][0]), dtype=numpy.int64)
+        for column, size in columns:
+            keys = keys * size + numpy.frombuffer(column, dtype=numpy.int64)
+        return array('q', keys.tobytes())
+
+    def statistic_values(self, groups: dict, key, commit_groups: dict | None = None):
+        """
+        creates the statistic of a key from the groups of (key, merge), commits are counted by the groups, unless
+        commit_groups are given
+        """
+        empty = array('q', bytes(8 * self.WIDTH))
+        values = GitRepositoryStatisticValues.from_sums(groups.get(key * 2, empty), groups.get(key * 2 + 1, empty))
+        if commit_groups is not None:
+            values[RepoCategory.COMMITS] = commit_groups.get(key * 2, 0)
+            values[RepoCategory.MERGE_COMMITS] = commit_groups.get(key * 2 + 1, 0)
+        return values
+
+    def aggregate(self):
+        """
+        returns the statistics of the authors per file, the authors, the files and the totals
+        """
+        number_of_authors = len(self.emails)
+        number_of_files = len(self.filenames)
+        groups = self.group_sums(self.combine((self.authors, number_of_authors), (self.files, number_of_files),
+                                              (self.merges, 2)), self.values)
+
+        group_authors = array('q')
+        group_files = array('q')
+        group_merges = array('q')
+        group_values = array('q')
+        authors_per_file = {email: {} for email in self.emails}
+        for key, sums in groups.items():
+            author, file = divmod(key // 2, number_of_files)
+            group_authors.append(author)
+            group_files.append(file)
+            group_merges.append(key % 2)
+            group_values.extend(sums)
+
+            files = authors_per_file[self.emails[author]]
+            if self.filenames[file] not in files:
+                files[self.filenames[file]] = self.statistic_values(groups, key // 2)
+
+        file_groups = self.group_sums(self.combine((group_files, number_of_files), (group_merges, 2)), group_values)
+        totals_per_file = {}
+        for files in authors_per_file.values():
+            for filename in files:
+                if filename not in totals_per_file:
+                    totals_per_file[filename] = self.statistic_values(file_groups, self.file_ids[filename])
+
+        author_groups = self.group_sums(self.combine((group_authors, number_of_authors), (group_merges, 2)),
+                                        group_values)
+        author_commits = self.group_counts(self.combine((self.commit_authors, number_of_authors),
+                                                        (self.commit_merges, 2)))
+        authors = {email: self.statistic_values(author_groups, author, author_commits)
+                   for author, email in enumerate(self.emails)}
+
+        totals = self.statistic_values(self.group_sums(group_merges, group_values), 0,
+                                       self.group_counts(self.commit_merges))
+        return authors_per_file, authors, totals_per_file, totals
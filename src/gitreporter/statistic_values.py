@@ -1,161 +1,161 @@
-import copy
+import operator
+from array import array
+from collections.abc import Mapping
 
 from .types import GitCommitStatisticCategory as CommitCategory, GitLineCategory as LineCategory, \
     GitRepositoryStatisticCategory as RepoCategory
 
 
-EMPTY_COMMIT_VALUE = {
-    LineCategory.EMPTY: 0,
-    LineCategory.SYMBOLS_ONLY: 0,
-    LineCategory.CODE: 0,
-    LineCategory.COMMENT: 0,
-    LineCategory.UNKNOWN: 0
-}
+# order of the line categories within a row, which is the order of the json output as well
+LINE_CATEGORIES = [
+    LineCategory.EMPTY,
+    LineCategory.SYMBOLS_ONLY,
+    LineCategory.CODE,
+    LineCategory.COMMENT,
+    LineCategory.UNKNOWN
+]
+LINE_INDEX = {category: idx for idx, category in enumerate(LINE_CATEGORIES)}
+ROW = len(LINE_CATEGORIES)
 
 
 def empty_value():
-    return copy.deepcopy(EMPTY_COMMIT_VALUE)
-
-
-class GitCommitStatisticValues(dict):
-    def __init__(self, insertions, deletions, modifications):
-        dict.__init__(self, {
-            CommitCategory.INSERTIONS: {
-                LineCategory.EMPTY: 0,
-                LineCategory.SYMBOLS_ONLY: 0,
-                LineCategory.CODE: 0,
-                LineCategory.COMMENT: 0,
-                LineCategory.UNKNOWN: 0
-            },
-            CommitCategory.DELETIONS: {
-                LineCategory.EMPTY: 0,
-                LineCategory.SYMBOLS_ONLY: 0,
-                LineCategory.CODE: 0,
-                LineCategory.COMMENT: 0,
-                LineCategory.UNKNOWN: 0
-            },
-            CommitCategory.MODIFICATIONS: {
-                LineCategory.EMPTY: 0,
-                LineCategory.SYMBOLS_ONLY: 0,
-                LineCategory.CODE: 0,
-                LineCategory.COMMENT: 0,
-                LineCategory.UNKNOWN: 0
-            }
-        })
-
-        for cat in LineCategory:
-            self[CommitCategory.INSERTIONS][cat] += insertions[cat]
-            self[CommitCategory.DELETIONS][cat] += deletions[cat]
-            self[CommitCategory.MODIFICATIONS][cat] += modifications[cat]
+    """
+    returns a row of counts, indexed by LINE_INDEX
+    """
+    return array('q', bytes(8 * ROW))
+
+
+def add_values(values: array, start: int, other: array):
+    end = start + len(other)
+    values[start:end] = array('q', map(operator.add, values[start:end], other))
+
+
+def create_offsets(categories, counts=()):
+    """
+    categories in counts are a single number, all other categories are a row
+    """
+    offsets = {}
+    size = 0
+    for category in categories:
+        offsets[category] = size
+        size += 1 if category in counts else ROW
+    return offsets, size
+
+
+class GitLineValues(Mapping):
+    """
+    Mapping view (line category -> count) of a row of a statistic, writing to the view changes the statistic.
+    """
+    __slots__ = ('values', 'offset')
+
+    def __init__(self, values: array, offset: int):
+        self.values = values
+        self.offset = offset
+
+    def __getitem__(self, category):
+        return self.values[self.offset + LINE_INDEX[category]]
+
+    def __setitem__(self, category, count):
+        self.values[self.offset + LINE_INDEX[category]] = count
+
+    def __iter__(self):
+        return iter(LINE_CATEGORIES)
+
+    def __len__(self):
+        return ROW
+
+
+class GitCommitStatisticValues:
+    """
+    Inserted, deleted and modified lines of a file per line category, the rows are stored in a single array.
+    """
+    __slots__ = ('values',)
+    OFFSETS, SIZE = create_offsets(CommitCategory)
+
+    def __init__(self, insertions: array, deletions: array, modifications: array):
+        self.values = insertions + deletions + modifications
+
+    def __getitem__(self, category):
+        return GitLineValues(self.values, self.OFFSETS[category])
 
     def __iadd__(self, other):
-        for c_category in CommitCategory:
-            for l_category in LineCategory:
-                self[c_category][l_category] += other[c_category][l_category]
+        add_values(self.values, 0, other.values)
         return self
 
+    def to_dict(self):
+        return {category: dict(self[category]) for category in CommitCategory}
 
-class GitRepositoryStatisticValues(dict):
-    def __init__(self, values, merge, empty=False):
-        dict.__init__(self, {
-            RepoCategory.SURVIVED_LINES: {
-                LineCategory.EMPTY: 0,
-                LineCategory.SYMBOLS_ONLY: 0,
-                LineCategory.CODE: 0,
-                LineCategory.COMMENT: 0,
-                LineCategory.UNKNOWN: 0
-            },
-            RepoCategory.INSERTIONS: {
-                LineCategory.EMPTY: 0,
-                LineCategory.SYMBOLS_ONLY: 0,
-                LineCategory.CODE: 0,
-                LineCategory.COMMENT: 0,
-                LineCategory.UNKNOWN: 0
-            },
-            RepoCategory.DELETIONS: {
-                LineCategory.EMPTY: 0,
-                LineCategory.SYMBOLS_ONLY: 0,
-                LineCategory.CODE: 0,
-                LineCategory.COMMENT: 0,
-                LineCategory.UNKNOWN: 0
-            },
-            RepoCategory.MODIFICATIONS: {
-                LineCategory.EMPTY: 0,
-                LineCategory.SYMBOLS_ONLY: 0,
-                LineCategory.CODE: 0,
-                LineCategory.COMMENT: 0,
-                LineCategory.UNKNOWN: 0
-            },
-            RepoCategory.COMMITS: 0,
-            RepoCategory.MERGE_INSERTIONS: {
-                LineCategory.EMPTY: 0,
-                LineCategory.SYMBOLS_ONLY: 0,
-                LineCategory.CODE: 0,
-                LineCategory.COMMENT: 0,
-                LineCategory.UNKNOWN: 0
-            },
-            RepoCategory.MERGE_DELETIONS: {
-                LineCategory.EMPTY: 0,
-                LineCategory.SYMBOLS_ONLY: 0,
-                LineCategory.CODE: 0,
-                LineCategory.COMMENT: 0,
-                LineCategory.UNKNOWN: 0
-            },
-            RepoCategory.MERGE_MODIFICATIONS: {
-                LineCategory.EMPTY: 0,
-                LineCategory.SYMBOLS_ONLY: 0,
-                LineCategory.CODE: 0,
-                LineCategory.COMMENT: 0,
-                LineCategory.UNKNOWN: 0
-            },
-            RepoCategory.MERGE_COMMITS: 0
-        })
 
-        if merge:
-            for cat in LineCategory:
-                self[RepoCategory.MERGE_INSERTIONS][cat] += values[CommitCategory.INSERTIONS][cat]
-                self[RepoCategory.MERGE_DELETIONS][cat] += values[CommitCategory.DELETIONS][cat]
-                self[RepoCategory.MERGE_MODIFICATIONS][cat] += values[
-                    CommitCategory.MODIFICATIONS][cat]
-            self[RepoCategory.MERGE_COMMITS] += 1
+class GitRepositoryStatisticValues:
+    """
+    Statistic of an author and/or a file, the rows of the repository categories and the numbers of commits are stored
+    in a single array. The insertions, deletions and modifications (and their merge counterparts) are consecutive
+    rows in the order of the commit categories, therefore the values of a commit are added at once.
+    """
+    __slots__ = ('values',)
+    COUNTS = (RepoCategory.COMMITS, RepoCategory.MERGE_COMMITS)
+    OFFSETS, SIZE = create_offsets(RepoCategory, COUNTS)
 
-        else:
-            for cat in LineCategory:
-                self[RepoCategory.INSERTIONS][cat] += values[CommitCategory.INSERTIONS][cat]
-                self[RepoCategory.DELETIONS][cat] += values[CommitCategory.DELETIONS][cat]
-                self[RepoCategory.MODIFICATIONS][cat] += values[CommitCategory.MODIFICATIONS][cat]
-            self[RepoCategory.COMMITS] += 1
+    def __init__(self, values: GitCommitStatisticValues, merge, empty=False):
+        self.values = array('q', bytes(8 * self.SIZE))
+        self.add(values, merge)
 
         if empty:
             self[RepoCategory.COMMITS] = 0
             self[RepoCategory.MERGE_COMMITS] = 0
 
-    def add(self, values, merge):
+    @classmethod
+    def empty(cls):
+        values = cls.__new__(cls)
+        values.values = array('q', bytes(8 * cls.SIZE))
+        return values
+
+    @classmethod
+    def from_sums(cls, sums: array, merge_sums: array):
+        """
+        creates a statistic without survived lines from the sums of commits and merge commits, each are the rows of the
+        commit categories followed by the number of commits
+        """
+        values = cls.__new__(cls)
+        values.values = empty_value() + sums + merge_sums
+        return values
+
+    def add(self, values: GitCommitStatisticValues, merge):
         if merge:
-            for cat in LineCategory:
-                self[RepoCategory.MERGE_INSERTIONS][cat] += values[CommitCategory.INSERTIONS][cat]
-                self[RepoCategory.MERGE_DELETIONS][cat] += values[CommitCategory.DELETIONS][cat]
-                self[RepoCategory.MERGE_MODIFICATIONS][cat] += values[CommitCategory.MODIFICATIONS][cat]
-            self[RepoCategory.MERGE_COMMITS] += 1
-
+            add_values(self.values, self.OFFSETS[RepoCategory.MERGE_INSERTIONS], values.values)
+            self.values[self.OFFSETS[RepoCategory.MERGE_COMMITS]] += 1
         else:
-            for cat in LineCategory:
-                self[RepoCategory.INSERTIONS][cat] += values[CommitCategory.INSERTIONS][cat]
-                self[RepoCategory.DELETIONS][cat] += values[CommitCategory.DELETIONS][cat]
-                self[RepoCategory.MODIFICATIONS][cat] += values[CommitCategory.MODIFICATIONS][cat]
-            self[RepoCategory.COMMITS] += 1
+            add_values(self.values, self.OFFSETS[RepoCategory.INSERTIONS], values.values)
+            self.values[self.OFFSETS[RepoCategory.COMMITS]] += 1
 
     def __iadd__(self, other):
-        for r_category in RepoCategory:
-            if r_category is RepoCategory.COMMITS or r_category is RepoCategory.MERGE_COMMITS:
-                self[r_category] += other[r_category]
-            else:
-                for l_category in LineCategory:
-                    self[r_category][l_category] += other[r_category][l_category]
+        add_values(self.values, 0, other.values)
         return self
 
+    def __getitem__(self, category):
+        if category in self.COUNTS:
+            return self.values[self.OFFSETS[category]]
+        return GitLineValues(self.values, self.OFFSETS[category])
+
+    def __setitem__(self, category, count):
+        assert category in self.COUNTS, "rows are changed by their line categories..."
+        self.values[self.OFFSETS[category]] = count
+
+    def copy(self):
+        copy = GitRepositoryStatisticValues.__new__(GitRepositoryStatisticValues)
+        copy.values = array('q', self.values)
+        return copy
+
+    def add_survived_lines(self, category: int, count: int):
+        """
+        category is the index of the line category (see LINE_INDEX)
+        """
+        self.values[self.OFFSETS[RepoCategory.SURVIVED_LINES] + category] += count
+
     def get_sum(self, category):
-        sum = 0
-        for cat in LineCategory:
-            sum += self[category][cat]
-        return sum
+        offset = self.OFFSETS[category]
+        return sum(self.values[offset:offset + ROW])
+
+    def to_dict(self):
+        return {category: self[category] if category in self.COUNTS else dict(self[category])
+                for category in RepoCategory}
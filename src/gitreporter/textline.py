@@ -1,12 +1,69 @@
 from .types import GitLineCategory as LineCategory
-from .statistic_values import empty_value
+from .statistic_values import empty_value, LINE_INDEX
+from .history import GitHistory
+
+
+class GitContentIds:
+    """
+    Intern table of an analysis, which maps the (normalized) content of a line to a compact integer id.
+    Equal contents have equal ids, therefore diffs operate on arrays of ids instead of strings.
+    The table is reset at the start of every analysis (see GitRepository.analyze), such that it does not grow across
+    runs in the same process.
+    """
+    ids: dict[str, int] = {}
+
+    @classmethod
+    def reset(cls):
+        """
+        ids of lines created before must not be compared with ids created afterwards
+        """
+        cls.ids = {}
+
+    @classmethod
+    def get_id(cls, content: str) -> int:
+        content_id = cls.ids.get(content)
+        if content_id is None:
+            content_id = len(cls.ids)
+            cls.ids[content] = content_id
+        return content_id
+
 
 class Textline:
-    def __init__(self, token_type: LineCategory, text: str, binsha: bytes):
+    def __init__(self, token_type: LineCategory, text: str, history: GitHistory):
         self.types: list[LineCategory] = [token_type]
         self.content: list[str] = [text]
-        self.history = [binsha]
+        self.history: GitHistory = history
         self.text = ''
+        self.content_id = -1
+
+    @classmethod
+    def restore(cls, types: list, content: list, text: str, content_id: int, history: GitHistory):
+        """
+        creates a line from parsed data (see GitLineCache), the lists are shared and must not be modified
+        """
+        line = cls.__new__(cls)
+        line.types = types
+        line.content = content
+        line.history = history
+        line.text = text
+        line.content_id = content_id
+        return line
+
+    def __getstate__(self):
+        # content ids are only valid in the current process
+        state = self.__dict__.copy()
+        state.pop('content_id', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.update_content_id()
+
+    def update_content_id(self):
+        """
+        has to be called as soon as the content of the line is complete
+        """
+        self.content_id = GitContentIds.get_id(self.to_string())
 
     def add_text(self, text):
         self.text = text
@@ -34,8 +91,8 @@ class Textline:
         return f"{self.text[:-1]:120s} | {repr(self.history)}"
     """
 
-    def add_history(self, history):
-        self.history = history + self.history
+    def add_history(self, history: GitHistory):
+        self.history = self.history.prepend(history)
 
     """
     def __len__(self):
@@ -61,19 +118,15 @@ class Textline:
 
     def update_symbols_only(self):
         for i in range(len(self.types)):
-            if self.types[i] is LineCategory.CODE:
-                for character in self.content[i]:
-                    if character not in "(){}[];:.,":
-                        break
-                else:
-                    self.types[i] = LineCategory.SYMBOLS_ONLY
+            if self.types[i] is LineCategory.CODE and not self.content[i].strip("(){}[];:.,"):
+                self.types[i] = LineCategory.SYMBOLS_ONLY
 
     @staticmethod
     def evaluate_lines(lines):
         result = empty_value()
         for line in lines:
             if len(line.types) == 1:
-                result[line.types[0]] += 1
+                result[LINE_INDEX[line.types[0]]] += 1
             else:
-                result[LineCategory.UNKNOWN] += 1
+                result[LINE_INDEX[LineCategory.UNKNOWN]] += 1
         return result
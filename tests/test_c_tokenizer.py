@@ -0,0 +1,133 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from gitreporter.file import GitFile
+from gitreporter.types import GitLineCategory as LineCategory
+
+pytest.importorskip('pygments')
+from pygments.lexer import RegexLexer
+from pygments.token import Comment, String, Text, Token
+
+
+TEST_DEFINITIONS = Path(__file__).parent.parent / 'test-definitions'
+
+
+class CppCommentLexer(RegexLexer):
+    """
+    the former lexer of GitFile.standardize_file, which is the reference of GitCTokenizer
+    """
+    tokens = {
+        'root': [
+            (r'//.*?$', Comment.Singleline),
+            (r'/\*', Comment.Multiline, 'comment-ml'),
+            (r'/', Text),
+            (r"'", String.Char, 'char'),
+            (r'"', String, 'string'),
+            (r'\n', Text.Whitespace),
+            (r'[^\'"/\n]+', Text)
+        ],
+        'comment-ml': [
+            (r'\*/', Comment.Multiline, 'root'),
+            (r'\*', Comment.Multiline),
+            (r'\n', Text.Whitespace),
+            (r'[^\*\n]+', Comment.Multiline)
+        ],
+        'char': [
+            (r"\\.", String.Char),
+            (r"[^\\'\n]+", String.Char),
+            (r"\n", Text.Whitespace),
+            (r"'", String.Char, 'root')
+        ],
+        'string': [
+            (r'\\\n', Text.Whitespace),
+            (r'\\.', String),
+            (r'[^"\\\n]+', String),
+            (r"\n", Text.Whitespace),
+            (r'"', String, 'root'),
+        ]
+    }
+
+
+def reference_lines(text: str):
+    """
+    returns (types, content) of every line, like the former standardize_file
+    """
+    lines = []
+    create_new = True
+
+    for _, token_type, token in CppCommentLexer().get_tokens_unprocessed(text):
+        content = "".join(token.split())
+        if token_type is Token.Text.Whitespace:
+            if create_new:
+                lines.append(([LineCategory.EMPTY], ['']))
+            create_new = True
+            continue
+        if not content:
+            continue
+
+        if token_type in (Token.Text, Token.String, Token.String.Char):
+            category = LineCategory.CODE
+        else:
+            assert token_type in (Token.Comment.Singleline, Token.Comment.Multiline), f'unexpected type: {token_type}'
+            category = LineCategory.COMMENT
+
+        if create_new:
+            lines.append(([category], [content]))
+            create_new = False
+        elif lines[-1][0][-1] is category:
+            lines[-1][1][-1] += content
+        else:
+            lines[-1][0].append(category)
+            lines[-1][1].append(content)
+
+    for types, contents in lines:
+        for idx, content in enumerate(contents):
+            if types[idx] is LineCategory.CODE and all(character in "(){}[];:.," for character in content):
+                types[idx] = LineCategory.SYMBOLS_ONLY
+    return lines
+
+
+def tokenizer_lines(text: str):
+    config = SimpleNamespace(options={'comments-and-coding-standard': True})
+    return [(line.types, line.content) for line in GitFile(text, bytes(20), config).lines]
+
+
+@pytest.mark.parametrize('path', sorted(TEST_DEFINITIONS.glob('*/version*.c')),
+                         ids=lambda path: f'{path.parent.name}/{path.name}')
+def test_test_definitions(path):
+    text = path.read_text()
+    assert tokenizer_lines(text) == reference_lines(text)
+
+
+@pytest.mark.parametrize('text', [
+    'int a = 1; \\\n    int b = 2;\n',
+    '#define MAX(a, b) \\\n    ((a) > (b) ? (a) : (b))\n',
+    'const char *s = "first \\\n second"; // done\n',
+    'auto r = R"(raw // not a comment)";\n',
+    'auto r = R"delimiter(\n/* inside */\n)delimiter";\n',
+    'const wchar_t *w = L"wide // string";\n',
+    "wchar_t c = L'\\'';\n",
+    'int a; /* starts here\n   continues\n * ends */ int b;\n',
+    '/**/ x = 1; /* a */ /* b */\n',
+    'printf("// not a comment"); // comment\n',
+    'printf("/* not a comment */");\n',
+    'char q = \'"\'; char s = \'/\'; x = a / b;\n',
+    '"escaped \\" quote // still string"\n',
+    '{\n\t};\n\n  (  )  \n',
+    '// comment \\\n continued\n',
+    '',
+    '\n\n',
+    'no newline at the end',
+])
+def test_edge_cases(text):
+    assert tokenizer_lines(text) == reference_lines(text)
+
+
+@pytest.mark.parametrize('text', ['s = "open \\', "c = '\\\n';\n"])
+def test_invalid_tokens(text):
+    with pytest.raises(AssertionError):
+        reference_lines(text)
+    with pytest.raises(AssertionError):
+        tokenizer_lines(text)
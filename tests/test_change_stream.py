@@ -0,0 +1,54 @@
+from pathlib import Path
+
+from git import Repo
+
+from gitreporter.change_stream import GitChangeStream
+from gitreporter.commit_graph import GitCommitGraph
+
+
+def commit(repo: Repo, files: dict[str, str], message: str):
+    for filename, content in files.items():
+        (Path(repo.working_dir) / filename).write_text(content)
+    repo.index.add(list(files))
+    return repo.index.commit(message).binsha
+
+
+def create_repo(path):
+    repo = Repo.init(path, initial_branch='main')
+    with repo.config_writer() as config:
+        config.set_value('user', 'name', 'Test')
+        config.set_value('user', 'email', 'test@example.com')
+    return repo
+
+
+def read_stream(repo: Repo):
+    graph = GitCommitGraph(repo, 'main')
+    return {(binsha, parent): sorted(change.path for change in changes)
+            for binsha, parent, changes in GitChangeStream(repo, 'main', graph)}
+
+
+def test_subject_with_merge_marker(tmp_path):
+    repo = create_repo(tmp_path)
+    first = commit(repo, {'x.c': 'int x;\n'}, 'initial')
+    second = commit(repo, {'y.c': 'int y;\n'}, '(from 0123456789abcdef0123456789abcdef01234567) revert style')
+
+    assert read_stream(repo) == {
+        (second, None): ['y.c'],
+        (first, None): ['x.c'],
+    }
+
+
+def test_merge_parents(tmp_path):
+    repo = create_repo(tmp_path)
+    base = commit(repo, {'x.c': 'int x;\n'}, 'initial')
+    main = commit(repo, {'y.c': 'int y;\n'}, 'main')
+    repo.git.checkout('-b', 'side', base.hex())
+    side = commit(repo, {'z.c': 'int z;\n'}, f'(from {main.hex()}) side')
+    repo.git.checkout('main')
+    repo.git.merge('side', '--no-edit', '-m', f'(from {side.hex()}) merge')
+    merge = repo.head.commit.binsha
+
+    changes = read_stream(repo)
+    assert changes[(merge, main)] == ['z.c']
+    assert changes[(merge, side)] == ['y.c']
+    assert changes[(side, None)] == ['z.c']
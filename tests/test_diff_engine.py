@@ -0,0 +1,74 @@
+import random
+from array import array
+
+import pytest
+
+from gitreporter import diff_engine
+from gitreporter.diff_engine import DIFF_ENGINES
+from gitreporter.textline import GitContentIds
+
+
+def random_lines(generator: random.Random, length: int):
+    return array('q', [generator.randrange(6) for _ in range(length)])
+
+
+def edited(generator: random.Random, lines: array):
+    lines = array('q', lines)
+    for _ in range(generator.randrange(4)):
+        position = generator.randrange(len(lines) + 1)
+        lines[position:position + generator.randrange(3)] = random_lines(generator, generator.randrange(3))
+    return lines
+
+
+def check_blocks(a, b, blocks):
+    assert blocks[-1] == (len(a), len(b), 0)
+    end_a = end_b = 0
+    for block in blocks[:-1]:
+        assert block.size > 0
+        assert block.a >= end_a and block.b >= end_b
+        assert a[block.a:block.a + block.size] == b[block.b:block.b + block.size]
+        end_a, end_b = block.a + block.size, block.b + block.size
+
+
+@pytest.mark.parametrize('engine', sorted(DIFF_ENGINES))
+@pytest.mark.parametrize('seed', range(30))
+def test_matching_blocks(engine, seed, monkeypatch):
+    generator = random.Random(seed)
+    # long common prefixes and suffixes use the vectorized comparison
+    prefix, suffix = random_lines(generator, 100), random_lines(generator, 70)
+    a = prefix + random_lines(generator, generator.randrange(30)) + suffix
+    b = edited(generator, a)
+
+    blocks = DIFF_ENGINES[engine]().matching_blocks(a, b)
+    check_blocks(a, b, blocks)
+
+    monkeypatch.setattr(diff_engine, 'numpy', None)
+    assert DIFF_ENGINES[engine]().matching_blocks(a, b) == blocks
+
+
+@pytest.mark.parametrize('engine', sorted(DIFF_ENGINES))
+@pytest.mark.parametrize('a, b', [([], []), ([1, 2], []), ([], [1]), ([1, 2, 3], [1, 2, 3]), ([1, 2, 1], [1])])
+def test_small_inputs(engine, a, b):
+    a, b = array('q', a), array('q', b)
+    check_blocks(a, b, DIFF_ENGINES[engine]().matching_blocks(a, b))
+
+
+def test_common_length():
+    pytest.importorskip('numpy')
+    engine = diff_engine.GitDiffEngine()
+    a = array('q', range(200))
+    b = array('q', range(200))
+    b[150] = -1
+    assert engine.common_length(a, b, 0, 0, 200) == 150
+    assert engine.common_length(a, b, 200, 200, 200, reverse=True) == 49
+    assert engine.common_length(a, b, 10, 10, 100) == 100
+
+
+def test_content_ids_reset():
+    GitContentIds.reset()
+    assert GitContentIds.get_id('int a;') == 0
+    assert GitContentIds.get_id('int b;') == 1
+    assert GitContentIds.get_id('int a;') == 0
+
+    GitContentIds.reset()
+    assert GitContentIds.get_id('int b;') == 0
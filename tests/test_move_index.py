@@ -0,0 +1,66 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from gitreporter.move_index import GitMovedCodeIndex
+
+
+def create_lines(content_ids, name):
+    return [SimpleNamespace(content_id=content_id, history=(name, position))
+            for position, content_id in enumerate(content_ids)]
+
+
+def reference_match(deletions, insertions, block_size):
+    """
+    the former linear scan over all indexed blocks of a key
+    """
+    matched = [bytearray(len(lines)) for lines in deletions]
+    blocks = {}
+    for idx, lines in enumerate(deletions):
+        for position in range(len(lines) - block_size + 1):
+            key = tuple(line.content_id for line in lines[position:position + block_size])
+            blocks.setdefault(key, []).append((idx, position))
+
+    histories = [None] * len(insertions)
+    i = 0
+    while i + block_size <= len(insertions):
+        key = tuple(line.content_id for line in insertions[i:i + block_size])
+        block = next(((idx, position) for idx, position in blocks.get(key, [])
+                      if not any(matched[idx][position:position + block_size])), None)
+        if block is None:
+            i += 1
+            continue
+
+        idx, position = block
+        lines = deletions[idx]
+        size = block_size
+        while i + size < len(insertions) and position + size < len(lines) and not matched[idx][position + size] \
+                and lines[position + size].content_id == insertions[i + size].content_id:
+            size += 1
+        for offset in range(size):
+            matched[idx][position + offset] = 1
+            histories[i + offset] = lines[position + offset].history
+        i += size
+    return histories, matched
+
+
+@pytest.mark.parametrize('block_size', [1, 2, 4])
+@pytest.mark.parametrize('seed', range(20))
+def test_matches_linear_scan(block_size, seed):
+    generator = random.Random(seed)
+    deletions = [create_lines([generator.randrange(4) for _ in range(generator.randrange(40))], f'file{idx}')
+                 for idx in range(3)]
+    insertion_ids = [generator.randrange(4) for _ in range(80)]
+
+    expected_histories, expected_matched = reference_match(deletions, create_lines(insertion_ids, 'insert'),
+                                                           block_size)
+
+    insertions = create_lines(insertion_ids, 'insert')
+    index = GitMovedCodeIndex(deletions, block_size)
+    matched_insertions = index.match(insertions)
+
+    assert matched_insertions == {i for i, history in enumerate(expected_histories) if history is not None}
+    assert [line.history for i, line in enumerate(insertions) if i in matched_insertions] == \
+        [history for history in expected_histories if history is not None]
+    assert index.matched == expected_matched
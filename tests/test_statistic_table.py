@@ -0,0 +1,78 @@
+import random
+from array import array
+
+import pytest
+
+from gitreporter import statistic_table
+from gitreporter.commit_statistic import GitCommitStatistic
+from gitreporter.statistic_table import GitStatisticTable
+from gitreporter.statistic_values import GitRepositoryStatisticValues, ROW
+from gitreporter.types import GitRepositoryStatisticCategory as RepoCategory
+
+
+def random_commits(seed: int):
+    generator = random.Random(seed)
+    commits = []
+    for _ in range(generator.randrange(1, 60)):
+        statistic = GitCommitStatistic()
+        for filename in generator.sample([f'file{idx}.c' for idx in range(8)], generator.randrange(4)):
+            statistic.add_file(filename, *(array('q', [generator.randrange(10) for _ in range(ROW)]) for _ in range(3)))
+        commits.append((f'author{generator.randrange(5)}@example.com', statistic, generator.random() < 0.3))
+    return commits
+
+
+def aggregate(commits):
+    table = GitStatisticTable()
+    for email, statistic, merge in commits:
+        table.add_commit(email, statistic, merge)
+    return to_dicts(*table.aggregate())
+
+
+def to_dicts(authors_per_file, authors, totals_per_file, totals):
+    return ({email: {filename: values.to_dict() for filename, values in files.items()}
+             for email, files in authors_per_file.items()},
+            {email: values.to_dict() for email, values in authors.items()},
+            {filename: values.to_dict() for filename, values in totals_per_file.items()},
+            totals.to_dict())
+
+
+def reference_aggregate(commits):
+    """
+    the former incremental aggregation, commit by commit
+    """
+    authors_per_file, authors, totals_per_file = {}, {}, {}
+    totals = GitRepositoryStatisticValues.empty()
+    for email, statistic, merge in commits:
+        commit_values = GitRepositoryStatisticValues.empty()
+        files = authors_per_file.setdefault(email, {})
+        for filename, values in statistic.file_mapping.items():
+            files.setdefault(filename, GitRepositoryStatisticValues.empty()).add(values, merge)
+            totals_per_file.setdefault(filename, GitRepositoryStatisticValues.empty()).add(values, merge)
+            commit_values.add(values, merge)
+        # every commit is counted once for its author and the totals
+        commit_values[RepoCategory.MERGE_COMMITS if merge else RepoCategory.COMMITS] = 1
+        author = authors.setdefault(email, GitRepositoryStatisticValues.empty())
+        author += commit_values
+        totals += commit_values
+    return to_dicts(authors_per_file, authors, totals_per_file, totals)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_numpy_and_python_aggregation(seed, monkeypatch):
+    pytest.importorskip('numpy')
+    commits = random_commits(seed)
+    expected = aggregate(commits)
+
+    monkeypatch.setattr(statistic_table, 'numpy', None)
+    result = aggregate(commits)
+
+    assert result == expected
+    # the order of the groups is part of the report
+    assert [list(part) for part in result[:3]] == [list(part) for part in expected[:3]]
+    assert [list(files) for files in result[0].values()] == [list(files) for files in expected[0].values()]
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_aggregation_matches_incremental_sums(seed):
+    commits = random_commits(seed)
+    assert aggregate(commits) == reference_aggregate(commits)